@@ -0,0 +1,57 @@
+"""
+Time and peak memory of checking a large transaction list parsed whole versus streamed.
+
+The body is produced chunk by chunk like a socket would deliver it. The "whole" path joins it and calls
+json.loads like response.json(); the "streamed" path feeds the chunks to utils.json_stream.iter_array.
+
+Run from the repository root:
+    python -m benchmarks.bench_json_stream [rows ...]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from utils.json_stream import CHUNK_SIZE, iter_array
+from utils.validation import validate_transactions
+
+
+def body_chunks(rows, chunk_size=CHUNK_SIZE):
+    pending = []
+    size = 0
+    for i in range(rows):
+        item = json.dumps({
+            "transactionId": f"tx-{i}", "amount": -12.5, "currency": "GBP", "merchantName": "Supermarket",
+            "timestamp": f"2025-06-05T12:{59 - i // 60 % 60:02d}:{59 - i % 60:02d}Z", "type": "Debit",
+            "subType": "CardPayment", "status": "Booked", "categoryId": 4, "description": "Groceries",
+        })
+        pending.append(("[" if i == 0 else ",") + item)
+        size += len(item) + 1
+        if size >= chunk_size:
+            yield "".join(pending).encode()
+            pending, size = [], 0
+    yield ("".join(pending) + ("]" if rows else "[]")).encode()
+
+
+def whole(rows):
+    validate_transactions(json.loads(b"".join(body_chunks(rows))))
+
+
+def streamed(rows):
+    validate_transactions(iter_array(body_chunks(rows)))
+
+
+def main(*sizes):
+    for rows in sizes or (10_000, 100_000):
+        for name, func in (("json.loads", whole), ("iter_array", streamed)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            func(rows)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<12} {rows:>9} rows {elapsed * 1000:9.1f} ms  peak {peak / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
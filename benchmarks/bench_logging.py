@@ -0,0 +1,54 @@
+"""
+Per-call cost of a log line on the synchronous stdout handler versus the queue-backed handler.
+
+Run from the repository root (stdout is where the log lines go, so redirect it):
+    python -m benchmarks.bench_logging [lines ...] > /dev/null
+"""
+import logging
+import sys
+import time
+
+from utils.custom_logger import AsyncHandler, BatchingListener
+
+
+class NoOpHandler(logging.Handler):
+    """
+    Baseline: the cost of creating and dispatching a record, without any output.
+    """
+
+    def emit(self, record):
+        pass
+
+
+def measure(handler, lines, drain=None):
+    logger = logging.getLogger(f"bench.{type(handler).__name__}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    try:
+        start = time.perf_counter()
+        for i in range(lines):
+            logger.info("✅ Test passed: %s for %s", "test_amount_sign_consistency", i)
+        emitted = time.perf_counter() - start
+        if drain is not None:
+            drain()
+        return emitted, time.perf_counter() - start
+    finally:
+        logger.removeHandler(handler)
+
+
+def main(*sizes):
+    for lines in sizes or (10_000, 100_000):
+        listener = BatchingListener(sys.stdout).start()
+        cases = (("no-op handler (baseline)", NoOpHandler(), None),
+                 ("StreamHandler(sys.stdout)", logging.StreamHandler(sys.stdout), None),
+                 ("AsyncHandler", AsyncHandler(listener.records), listener.flush))
+        for name, handler, drain in cases:
+            emitted, written = measure(handler, lines, drain)
+            print(f"{name:<28} {lines:>8} lines {emitted / lines * 1e6:7.2f} us/call in the caller, "
+                  f"{written * 1000:8.1f} ms until written", file=sys.stderr)
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,70 @@
+"""
+Ordering check cost for large, correctly ordered responses: check_ordering against the two-pass check it
+replaced. Every timestamp is distinct.
+
+Run from the repository root:
+    python -m benchmarks.bench_ordering [rows ...]
+"""
+import gc
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils.ordering import check_ordering
+
+
+def two_pass_ordering(transactions):
+    """
+    The previous validate_transaction_ordering: filtered copies and two parses per timestamp.
+    """
+    pending = [t for t in transactions if t['status'] == 'Pending']
+    booked = [t for t in transactions if t['status'] == 'Booked']
+    for i in range(len(pending)):
+        assert transactions[i]['status'] == 'Pending'
+    for group in [pending, booked]:
+        for i in range(len(group) - 1):
+            t1 = datetime.fromisoformat(group[i]['timestamp'].replace('Z', '+00:00'))
+            t2 = datetime.fromisoformat(group[i + 1]['timestamp'].replace('Z', '+00:00'))
+            assert t1 >= t2
+
+
+def ordered_transactions(rows, pending_ratio=0.1):
+    start = datetime(2025, 6, 5, tzinfo=timezone.utc)
+    pending = int(rows * pending_ratio)
+    return [{
+        "transactionId": str(i),
+        "status": "Pending" if i < pending else "Booked",
+        "timestamp": (start - timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    } for i in range(rows)]
+
+
+def best_of(funcs, transactions, repeat):
+    """
+    Best time of each function, running them in turn so that machine load affects them alike. The garbage
+    collector is paused while timing, like timeit does.
+    """
+    best = [float("inf")] * len(funcs)
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for i, func in enumerate(funcs):
+                start = time.perf_counter()
+                func(transactions)
+                best[i] = min(best[i], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main(*sizes):
+    for rows in sizes or (10_000, 100_000, 300_000):
+        # About three million rows per function, so small sizes get enough runs to find their best
+        baseline, single = best_of((two_pass_ordering, check_ordering), ordered_transactions(rows),
+                                   max(5, 3_000_000 // rows))
+        for name, elapsed in (("two-pass (baseline)", baseline), ("single-pass", single)):
+            print(f"{name:<20} {rows:>9} rows {elapsed * 1000:9.1f} ms {elapsed / rows * 1e9:8.0f} ns/row")
+        print(f"{'':<20} single-pass / two-pass: {single / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
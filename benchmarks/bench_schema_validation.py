@@ -0,0 +1,58 @@
+"""
+Per-transaction schema validation cost.
+
+Run from the repository root:
+    python -m benchmarks.bench_schema_validation [number_of_transactions]
+"""
+import sys
+import timeit
+
+from jsonschema import validate
+from jsonschema.exceptions import best_match
+
+from utils.schema import transaction_schema
+from utils.validation import is_valid_transaction, transaction_validator
+
+SAMPLE_TRANSACTION = {
+    "transactionId": "7f1c2e3a-4b5c-4a6e-9f7d-b3c8f5d24c0b",
+    "amount": -12.5,
+    "currency": "GBP",
+    "merchantName": "Coffee Shop",
+    "timestamp": "2025-06-05T08:15:00Z",
+    "type": "Debit",
+    "subType": "CardPayment",
+    "status": "Booked",
+    "categoryId": 11,
+    "description": "Flat white",
+}
+
+
+def transaction_error(transaction):
+    """
+    The most relevant ValidationError of a transaction, or None: the compiled fast path, falling back to the
+    generic validator only to explain an invalid transaction.
+    """
+    if is_valid_transaction(transaction):
+        return None
+    return best_match(transaction_validator.iter_errors(transaction))
+
+
+def per_transaction_us(func, transactions, repeat=5):
+    best = min(timeit.repeat(lambda: [func(tx) for tx in transactions], number=1, repeat=repeat))
+    return best / len(transactions) * 1e6
+
+
+def main(count=2000):
+    transactions = [dict(SAMPLE_TRANSACTION, transactionId=str(i)) for i in range(count)]
+    cases = {
+        "jsonschema.validate (per call)": lambda tx: validate(instance=tx, schema=transaction_schema),
+        "cached validator": transaction_validator.is_valid,
+        "compiled fast path": is_valid_transaction,
+        "transaction_error (fast + fallback)": transaction_error,
+    }
+    for name, func in cases.items():
+        print(f"{name:<36} {per_transaction_us(func, transactions):8.2f} us/transaction")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,683 @@
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+
+import pytest
+
+from utils import custom_logger, filter_matrix, http_client, query_fuzz
+from utils import transactions_api as api
+from utils.async_engine import run_concurrently
+from utils.cassette import MODES, Cassette
+from utils.customers import CUSTOMERS
+from utils.durations import DurationStore, longest_first
+from utils.filter_oracle import FilterOracle
+from utils.latency import LatencyHistogram, LatencyRecorder, PhaseRecorder, variant_of
+from utils.result_sink import JsonLinesSink
+from utils.sharding import Worker, dump_responses, load_responses, partition, write_record
+from utils.standin_server import StandInServer, TransactionsStore, parse_defects
+
+connection_stats_key = pytest.StashKey[dict]()
+prefetch_stats_key = pytest.StashKey[tuple]()
+standin_server_key = pytest.StashKey[StandInServer]()
+latency_slo_results_key = pytest.StashKey[list]()
+shard_stats_key = pytest.StashKey[list]()
+duration_store_key = pytest.StashKey[DurationStore]()
+result_sink_key = pytest.StashKey[JsonLinesSink]()
+
+# Wall-clock time of each test in this run (setup, call and teardown)
+test_durations = {}
+
+# Per-phase request timings by test and by customer, see utils.http_client.PHASES
+phases_by_test = PhaseRecorder(http_client.PHASES)
+phases_by_customer = PhaseRecorder(http_client.PHASES)
+customer_keys = {customer_id: key for key, customer_id in CUSTOMERS.items()}
+# Node ID of the running test; requests sent before any test runs are prefetches
+current_test = "(prefetch)"
+
+
+def record_phases(params, response, seconds):
+    timings = getattr(response, "timings", None)
+    if timings is None:
+        return
+    phases_by_test.record(current_test, timings)
+    customer_id = params.get("customerId")
+    # Unknown and malformed IDs (negative tests, fuzzing) share one row instead of one row each
+    group = customer_keys.get(customer_id, "(other)" if customer_id else "(no customerId)")
+    phases_by_customer.record(group, timings)
+
+
+class HtmlSummary:
+    """
+    Adds the suite's runtime statistics to the pytest-html summary section.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_html_results_summary(self, prefix, summary, postfix):
+        stats = self.config.stash.get(connection_stats_key, {})
+        for host, entry in stats.items():
+            prefix.append(f"<p>Connections to {host}: {entry['requests']} requests over "
+                          f"{entry['connections']} connections ({entry['reused']} reused)</p>")
+        rows = api.latencies.report_rows()
+        if rows:
+            cells = "".join(f"<tr><td>{variant}</td><td>{count}</td>"
+                            + "".join(f"<td>{value:.2f}</td>" for value in values) + "</tr>"
+                            for variant, count, *values in rows)
+            prefix.append("<p>Request latency (ms)</p><table><tr><th>variant</th><th>count</th><th>p50</th>"
+                          "<th>p90</th><th>p99</th><th>p99.9</th><th>max</th></tr>" + cells + "</table>")
+        for title, recorder in (("test", phases_by_test), ("customer", phases_by_customer)):
+            rows = recorder.report_rows()
+            if not rows:
+                continue
+            header = "".join(f"<th>{phase}</th>" for phase in (*recorder.phases, "total", "p95 total"))
+            cells = "".join(f"<tr><td>{group}</td><td>{count}</td>"
+                            + "".join(f"<td>{value:.2f}</td>" for value in values) + "</tr>"
+                            for group, count, *values in rows)
+            prefix.append(f"<p>Request phases by {title} (mean ms)</p><table><tr><th>{title}</th><th>count</th>"
+                          + header + "</tr>" + cells + "</table>")
+
+
+class ExchangeRecorder:
+    """
+    API observer writing one "exchange" record per request sent over the wire.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __call__(self, params, response, seconds):
+        # A streamed body has not been read yet; reading it here would defeat streaming
+        size = response.headers.get("content-length") if response.streamed else len(response.content)
+        self.sink.write("exchange", test=current_test, variant=variant_of(params), params=params,
+                        status=response.status_code, bytes=None if size is None else int(size),
+                        seconds=round(seconds, 6),
+                        timings={phase: round(value, 6) for phase, value in getattr(response, "timings", {}).items()})
+
+
+class TestResultWriter:
+    """
+    Writes one "test" record per test once all of its reports are in.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.reports = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.reports.setdefault(report.nodeid, []).append(report)
+
+    def pytest_runtest_logfinish(self, nodeid):
+        reports = self.reports.pop(nodeid, None)
+        if reports:
+            write_test_result(self.sink, reports)
+
+
+def write_test_result(sink, reports):
+    """
+    Writes the "test" record of a test from its setup/call/teardown reports.
+    """
+    failed = next((report for report in reports if report.failed), None)
+    skipped = next((report for report in reports if report.skipped), None)
+    call = next((report for report in reports if report.when == "call"), None)
+    if failed is not None:
+        outcome = "failed" if failed.when == "call" else "error"
+    elif skipped is not None:
+        outcome = "skipped"
+    else:
+        outcome = call.outcome if call is not None else "passed"
+    failure = None
+    if failed is not None:
+        crash = getattr(failed.longrepr, "reprcrash", None)
+        failure = crash.message if crash is not None else failed.longreprtext.strip()
+    sink.write("test", nodeid=reports[0].nodeid, outcome=outcome,
+               duration=round(sum(report.duration for report in reports), 6),
+               phases={report.when: round(report.duration, 6) for report in reports}, failure=failure,
+               properties=dict(call.user_properties) if call is not None else {})
+
+
+class ShardWorker:
+    """
+    Streams the test reports and runtime statistics of a shard worker to the controller (see utils.sharding).
+    """
+
+    def __init__(self, config, path):
+        self.config = config
+        self.file = open(path, "w", encoding="utf-8")
+
+    def pytest_runtest_logreport(self, report):
+        write_record(self.file, "report",
+                     self.config.hook.pytest_report_to_serializable(config=self.config, report=report))
+
+    def pytest_sessionfinish(self, session):
+        write_record(self.file, "stats", {
+            "latencies": api.latencies.to_dict(),
+            "phases_by_test": phases_by_test.to_dict(),
+            "phases_by_customer": phases_by_customer.to_dict(),
+            "connections": self.config.stash.get(connection_stats_key, {}),
+            "cache": [api.cache.hits, api.cache.misses],
+            "latency_slo": self.config.stash.get(latency_slo_results_key, []),
+        })
+        self.file.close()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--prefetch-concurrency", type=int, default=8,
+                     help="Maximum number of concurrent requests used to prefetch the responses of "
+                          "tests marked with @pytest.mark.prefetch (0 disables prefetching).")
+    parser.addoption("--cache-ttl", type=float, default=300.0,
+                     help="Seconds a cached response stays valid (0 disables the response cache).")
+    parser.addoption("--cassette-mode", choices=MODES, default="off",
+                     help="record: store every response on disk; replay: serve responses from disk without "
+                          "network; hybrid: serve from disk and only go to the network on a miss.")
+    parser.addoption("--cassette", default="cassettes/transactions.json",
+                     help="Path of the cassette file used by --cassette-mode (relative to the rootdir).")
+    parser.addoption("--standin", action="store_true",
+                     help="Run the tests against the local stand-in server (utils/standin_server.py) "
+                          "instead of BASE_URL.")
+    parser.addoption("--standin-defects", default="all",
+                     help="Known API defects the stand-in server injects: all, none or a comma-separated list.")
+    parser.addoption("--shards", type=int, default=1,
+                     help="Run the tests in this many worker processes, balanced by their durations in "
+                          "previous runs. Prefetched responses are fetched once and shared by every worker.")
+    parser.addoption("--durations-file", default=".test_durations.json",
+                     help="File the duration of every test is recorded in across runs (relative to the "
+                          "rootdir; empty disables it).")
+    parser.addoption("--longest-first", action="store_true",
+                     help="Run the slowest tests (by recorded duration) first, also within each shard.")
+    parser.addoption("--stream-json", action="store_true",
+                     help="Parse transaction lists incrementally and run the schema, ordering and sign checks "
+                          "while the response body downloads.")
+    parser.addoption("--filter-matrix", action="store_true",
+                     help="Sweep every categoryId x includePending x date window combination for each customer "
+                          "(utils/filter_matrix.py) and check it against the unfiltered list.")
+    parser.addoption("--filter-matrix-rps", type=float, default=200.0,
+                     help="Maximum requests per second sent by the filter matrix sweep.")
+    parser.addoption("--filter-matrix-concurrency", type=int, default=16,
+                     help="Maximum requests in flight during the filter matrix sweep.")
+    parser.addoption("--fuzz-budget", type=float, default=2.0,
+                     help="Seconds test_query_fuzz spends sending randomly generated queries "
+                          "(utils/query_fuzz.py); 0 disables it.")
+    parser.addoption("--fuzz-rps", type=float, default=50.0,
+                     help="Maximum requests per second sent by test_query_fuzz.")
+    parser.addoption("--fuzz-seed", type=int, default=None,
+                     help="Seed of the fuzzed queries, to reproduce a run (random when left out).")
+    parser.addoption("--results-jsonl", default=None,
+                     help="Stream one JSON record per test and per HTTP exchange to this file as they happen.")
+    parser.addoption("--shard-report", default=None,
+                     help="Internal: file a shard worker streams its test reports to.")
+    parser.addoption("--shared-cache", default=None,
+                     help="Internal: file of responses prefetched by the shard controller.")
+
+
+def pytest_configure(config):
+    if config.pluginmanager.hasplugin("html"):
+        config.pluginmanager.register(HtmlSummary(config), "transactions-html-summary")
+    ttl = config.getoption("--cache-ttl")
+    api.cache.enabled = ttl > 0
+    api.cache.ttl = ttl
+    api.cassette = Cassette(os.path.join(config.rootpath, config.getoption("--cassette")),
+                            config.getoption("--cassette-mode"))
+    api.stream_responses = config.getoption("--stream-json")
+    if config.getoption("--standin"):
+        store = TransactionsStore.sample(parse_defects(config.getoption("--standin-defects")))
+        server = StandInServer(store).start()
+        config.stash[standin_server_key] = server
+        api.BASE_URL = server.url
+    shard_report = config.getoption("--shard-report")
+    durations_file = config.getoption("--durations-file")
+    if durations_file and not shard_report:
+        config.stash[duration_store_key] = DurationStore(os.path.join(config.rootpath, durations_file))
+    results_jsonl = config.getoption("--results-jsonl")
+    if results_jsonl:
+        # Shard workers append their exchanges to the file the controller created
+        sink = JsonLinesSink(os.path.join(config.rootpath, results_jsonl), "a" if shard_report else "w")
+        config.stash[result_sink_key] = sink
+        api.observers.append(ExchangeRecorder(sink))
+        if not shard_report:
+            config.pluginmanager.register(TestResultWriter(sink), "transactions-test-results")
+    if shard_report:
+        config.pluginmanager.register(ShardWorker(config, shard_report), "transactions-shard-worker")
+    shared_cache = config.getoption("--shared-cache")
+    if shared_cache:
+        for params, response in load_responses(shared_cache, api.BASE_URL):
+            api.cache.put(api.query_key(params), response)
+
+
+def pytest_unconfigure(config):
+    sink = config.stash.get(result_sink_key, None)
+    if sink is not None:
+        sink.close()
+    server = config.stash.get(standin_server_key, None)
+    if server is not None:
+        server.stop()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def pooled_client(request):
+    """
+    Session-wide keep-alive client shared by every test.
+    """
+    client = http_client.get_client()
+    api.observers.append(record_phases)
+    yield client
+    api.observers.remove(record_phases)
+    request.config.stash[connection_stats_key] = http_client.close_client()
+    api.cassette.save()
+
+
+def prefetch_plan(items):
+    """
+    Collects the queries declared by @pytest.mark.prefetch(customers, *queries, param="customer_key").
+    The customer ID is looked up in `customers` using the value of the test's `param` parameter.
+    """
+    plan = []
+    for item in items:
+        marker = item.get_closest_marker("prefetch")
+        if marker is None or not hasattr(item, "callspec"):
+            continue
+        customers, *queries = marker.args
+        customer_key = item.callspec.params[marker.kwargs.get("param", "customer_key")]
+        for query in queries or [{}]:
+            plan.append(api.build_params(customers[customer_key], **query))
+    return plan
+
+
+@pytest.fixture(scope="session", autouse=True)
+def prefetched_responses(request, pooled_client):
+    """
+    Issues every request the selected prefetch-marked tests need concurrently before they run.
+    """
+    concurrency = request.config.getoption("--prefetch-concurrency")
+    plan = prefetch_plan(request.session.items) if concurrency > 0 else []
+    if plan:
+        start = time.perf_counter()
+        stored = api.prefetch(plan, concurrency)
+        request.config.stash[prefetch_stats_key] = (stored, len(plan), time.perf_counter() - start)
+    yield
+    api.prefetched.clear()
+    api.cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def phase_attribution(request):
+    """
+    Attributes the requests a test sends to it in the per-phase timing report.
+    """
+    global current_test
+    current_test = request.node.nodeid
+    yield
+    current_test = "(between tests)"
+
+
+@pytest.fixture(autouse=True)
+def cache_opt_out(request):
+    """
+    Tests marked with @pytest.mark.no_cache or @pytest.mark.latency_slo always send their requests
+    over the wire.
+    """
+    api.cache.bypass = any(request.node.get_closest_marker(name) is not None
+                           for name in ("no_cache", "latency_slo"))
+    yield
+    api.cache.bypass = False
+
+
+@pytest.fixture(scope="session")
+def filter_oracle():
+    """
+    Returns the FilterOracle of a customer, built once per session from their unfiltered transactions so
+    filtered responses can be checked without extra requests (the unfiltered list is usually already
+    cached or prefetched).
+    """
+    oracles = {}
+
+    def oracle(customer_id):
+        if customer_id not in oracles:
+            response = api.fetch(api.build_params(customer_id))
+            assert response.status_code == 200, f"Unfiltered request for {customer_id} returned {response.status_code}"
+            oracles[customer_id] = FilterOracle(api.transactions(response))
+        return oracles[customer_id]
+
+    return oracle
+
+
+@pytest.fixture
+def filter_matrix_sweep(request, filter_oracle):
+    """
+    Returns a function that sweeps the filter matrix of a customer (see utils.filter_matrix) at the
+    configured rate and concurrency. Tests using it are skipped unless --filter-matrix is given, and when a
+    cassette is in use, since the sweep is meant to exercise the live filtering code at a paced rate.
+    """
+    config = request.config
+    if not config.getoption("--filter-matrix"):
+        pytest.skip("filter matrix sweep runs with --filter-matrix")
+    if api.cassette.mode != "off":
+        pytest.skip("the filter matrix sweep is not recorded to or replayed from a cassette")
+
+    def sweep(customer_id):
+        return filter_matrix.sweep(customer_id, filter_oracle(customer_id),
+                                   config.getoption("--filter-matrix-concurrency"),
+                                   config.getoption("--filter-matrix-rps"))
+
+    return sweep
+
+
+@pytest.fixture
+def query_fuzzer(request, filter_oracle):
+    """
+    Returns a function that fuzzes the query parameters (see utils.query_fuzz) within --fuzz-budget and
+    --fuzz-rps, checking 200 responses of the test customers against their filter oracle. Tests using it are
+    skipped when the budget is 0 or a cassette is in use, since random queries cannot be replayed.
+    """
+    config = request.config
+    budget = config.getoption("--fuzz-budget")
+    if budget <= 0:
+        pytest.skip("query fuzzing is disabled with --fuzz-budget=0")
+    if api.cassette.mode != "off":
+        pytest.skip("query fuzzing sends random queries a cassette cannot replay")
+    seed = config.getoption("--fuzz-seed")
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    oracle_customers = {CUSTOMERS[key] for key in filter_matrix.MATRIX_CUSTOMERS}
+
+    def oracle_for(customer_id):
+        return filter_oracle(customer_id) if customer_id in oracle_customers else None
+
+    def fuzz():
+        return query_fuzz.fuzz(budget, config.getoption("--fuzz-rps"), seed=seed, oracle_for=oracle_for)
+
+    return fuzz
+
+
+def parse_latency_budget(marker):
+    """
+    Reads @pytest.mark.latency_slo(p95=150, repetitions=20): budgets in milliseconds keyed by percentile
+    (p50, p90, p95, p99, p99_9 or max) and the number of times the test body is run.
+    """
+    repetitions = marker.kwargs.get("repetitions", 20)
+    budget = {}
+    for key, limit in marker.kwargs.items():
+        if key == "repetitions":
+            continue
+        if key == "max":
+            budget[key] = (100, limit)
+        elif key.startswith("p"):
+            budget[key] = (float(key[1:].replace("_", ".")), limit)
+        else:
+            raise ValueError(f"Unknown latency_slo budget {key!r}")
+    if not budget:
+        raise ValueError("latency_slo needs at least one budget, e.g. p95=150")
+    return budget, repetitions
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Runs tests marked with @pytest.mark.latency_slo `repetitions` times and fails them when the latency
+    of the requests they sent exceeds the declared budget. Responses replayed from a cassette have no
+    latency, so under a cassette the test runs once without the latency check.
+    """
+    marker = pyfuncitem.get_closest_marker("latency_slo")
+    if marker is None:
+        return None
+    budget, repetitions = parse_latency_budget(marker)
+    if api.cassette.plays:
+        pyfuncitem.config.stash.setdefault(latency_slo_results_key, []).append(
+            (pyfuncitem.nodeid, "skipped", f"responses are replayed from the cassette ({api.cassette.mode})"))
+        return None
+    histogram = LatencyHistogram()
+
+    def observe(params, response, seconds):
+        histogram.record_seconds(seconds)
+
+    testargs = {arg: pyfuncitem.funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+    base_logger = logging.getLogger(custom_logger.BASE_LOGGER)
+    level = base_logger.level
+    api.observers.append(observe)
+    try:
+        for _ in range(repetitions):
+            pyfuncitem.obj(**testargs)
+            # The test's info lines are logged for the first run only; warnings and errors always are
+            base_logger.setLevel(max(level, logging.WARNING))
+    finally:
+        base_logger.setLevel(level)
+        api.observers.remove(observe)
+
+    measured = {key: histogram.percentile(q) / 1000 for key, (q, _) in budget.items()}
+    distribution = (f"{histogram.total} requests over {repetitions} runs: "
+                    + ", ".join(f"p{q:g}={histogram.percentile(q) / 1000:.1f}ms" for q in (50, 90, 95, 99))
+                    + f", max={histogram.max / 1000:.1f}ms")
+    exceeded = [f"{key} {measured[key]:.1f}ms > {limit}ms" for key, (_, limit) in budget.items()
+                if measured[key] > limit]
+    pyfuncitem.user_properties.append(("latency_slo", distribution))
+    pyfuncitem.config.stash.setdefault(latency_slo_results_key, []).append(
+        (pyfuncitem.nodeid, "FAILED" if exceeded else "passed", distribution))
+    if exceeded:
+        pytest.fail(f"Latency SLO exceeded ({'; '.join(exceeded)}); {distribution}", pytrace=False)
+    return True
+
+
+def share_prefetched_responses(session, directory):
+    """
+    Sends the queries of every prefetch-marked test once over this process's pool and writes the responses
+    to a shared cache file for the shard workers. Returns its path, or None when there is nothing to share.
+    """
+    config = session.config
+    concurrency = config.getoption("--prefetch-concurrency")
+    if not api.cache.enabled or concurrency <= 0:
+        return None
+    plan = list({api.query_key(params): params for params in prefetch_plan(session.items)}.values())
+    if not plan:
+        return None
+    start = time.perf_counter()
+    api.observers.append(record_phases)
+    try:
+        responses = run_concurrently(api.send, [(params,) for params in plan], concurrency)
+    finally:
+        api.observers.remove(record_phases)
+    shared = [(params, response) for params, response in zip(plan, responses)
+              if not isinstance(response, Exception) and response.status_code < 500]
+    config.stash[prefetch_stats_key] = (len(shared), len(plan), time.perf_counter() - start)
+    path = os.path.join(directory, "shared-cache.json")
+    dump_responses(path, shared)
+    return path
+
+
+def replay_report(config, items, progress, data):
+    report = config.hook.pytest_report_from_serializable(config=config, data=data)
+    if report.skipped and isinstance(report.longrepr, list):
+        # JSON turned the (path, lineno, reason) tuple of a skip into a list; the terminal reporter asserts a tuple
+        report.longrepr = tuple(report.longrepr)
+    location = items[report.nodeid].location
+    if report.when == "setup":
+        config.hook.pytest_runtest_logstart(nodeid=report.nodeid, location=location)
+    config.hook.pytest_runtest_logreport(report=report)
+    progress[report.nodeid] = report.when
+    if report.when == "teardown":
+        config.hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=location)
+
+
+def report_lost_tests(config, items, progress, worker):
+    """
+    Fails the tests of a worker that exited before reporting them, e.g. because it crashed.
+    """
+    for nodeid in worker.nodeids:
+        if progress.get(nodeid) == "teardown":
+            continue
+        item = items[nodeid]
+        message = (f"Shard worker {worker.index} exited with code {worker.process.returncode} before "
+                   f"{nodeid} finished. Last lines of its output:\n{worker.log_tail()}")
+        if nodeid not in progress:
+            config.hook.pytest_runtest_logstart(nodeid=nodeid, location=item.location)
+        report = pytest.TestReport(nodeid, item.location, {keyword: 1 for keyword in item.keywords}, "failed",
+                                   message, "setup" if nodeid not in progress else "call")
+        config.hook.pytest_runtest_logreport(report=report)
+        config.hook.pytest_runtest_logfinish(nodeid=nodeid, location=item.location)
+
+
+def merge_worker_stats(config, stats):
+    api.latencies.merge(LatencyRecorder.from_dict(stats["latencies"]))
+    phases_by_test.merge(PhaseRecorder.from_dict(http_client.PHASES, stats["phases_by_test"]))
+    phases_by_customer.merge(PhaseRecorder.from_dict(http_client.PHASES, stats["phases_by_customer"]))
+    connections = config.stash.setdefault(connection_stats_key, {})
+    for host, entry in stats["connections"].items():
+        total = connections.setdefault(host, dict.fromkeys(entry, 0))
+        for name, value in entry.items():
+            total[name] += value
+    hits, misses = stats["cache"]
+    api.cache.hits += hits
+    api.cache.misses += misses
+    config.stash.setdefault(latency_slo_results_key, []).extend(tuple(result) for result in stats["latency_slo"])
+
+
+def run_shards(session):
+    """
+    Runs session.items in --shards worker processes and replays their reports in this process.
+    """
+    config = session.config
+    items = {item.nodeid: item for item in session.items}
+    store = config.stash.get(duration_store_key, None)
+    shards = partition(list(items), store.estimates() if store is not None else {}, config.getoption("--shards"),
+                       ordered=config.getoption("--longest-first"))
+    env = dict(os.environ)
+    if api.BASE_URL:
+        env["BASE_URL"] = api.BASE_URL
+
+    with tempfile.TemporaryDirectory(prefix="transactions-shards-") as directory:
+        args = ["--cache-ttl", str(config.getoption("--cache-ttl"))]
+        if api.stream_responses:
+            args.append("--stream-json")
+        if config.getoption("--filter-matrix"):
+            # The rate limit applies to the whole run, so each worker gets its share of it
+            args += ["--filter-matrix",
+                     "--filter-matrix-concurrency", str(config.getoption("--filter-matrix-concurrency")),
+                     "--filter-matrix-rps", str(config.getoption("--filter-matrix-rps") / len(shards))]
+        args += ["--fuzz-budget", str(config.getoption("--fuzz-budget")),
+                 "--fuzz-rps", str(config.getoption("--fuzz-rps"))]
+        if config.getoption("--fuzz-seed") is not None:
+            args += ["--fuzz-seed", str(config.getoption("--fuzz-seed"))]
+        sink = config.stash.get(result_sink_key, None)
+        if sink is not None:
+            args += ["--results-jsonl", sink.path]
+        shared_cache = share_prefetched_responses(session, directory)
+        if shared_cache:
+            args += ["--shared-cache", shared_cache, "--prefetch-concurrency", "0"]
+        else:
+            args += ["--prefetch-concurrency", str(config.getoption("--prefetch-concurrency"))]
+        config.stash[connection_stats_key] = http_client.close_client()
+
+        workers = []
+        for index, nodeids in enumerate(shards):
+            worker_args = list(args)
+            if api.cassette.mode != "off":
+                cassette_path = os.path.join(directory, f"cassette-{index}.json")
+                with open(cassette_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "interactions": api.cassette.interactions}, f)
+                worker_args += ["--cassette-mode", api.cassette.mode, "--cassette", cassette_path]
+            workers.append(Worker(index, nodeids, os.path.join(directory, f"reports-{index}.jsonl"),
+                                  os.path.join(directory, f"worker-{index}.log"), worker_args,
+                                  str(config.rootpath), env))
+
+        start = time.perf_counter()
+        progress = {}
+        running = list(workers)
+        while running:
+            for worker in list(running):
+                # Check for exit before reading so the records written just before it are not missed
+                exited = not worker.running
+                for record in worker.reader.read():
+                    if record["kind"] == "report":
+                        replay_report(config, items, progress, record["data"])
+                    else:
+                        merge_worker_stats(config, record["data"])
+                if exited:
+                    running.remove(worker)
+                    report_lost_tests(config, items, progress, worker)
+                    config.stash.setdefault(shard_stats_key, []).append(
+                        (worker.index, len(worker.nodeids), time.perf_counter() - start, worker.process.returncode))
+            if running:
+                time.sleep(0.02)
+
+        if api.cassette.records:
+            for worker in workers:
+                path = os.path.join(directory, f"cassette-{worker.index}.json")
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as f:
+                        api.cassette.interactions.update(json.load(f)["interactions"])
+                    api.cassette.dirty = True
+            api.cassette.save()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if (config.getoption("--shards") <= 1 or config.getoption("--shard-report") or config.option.collectonly
+            or session.testsfailed or not session.items):
+        return None
+    run_shards(session)
+    return True
+
+
+def pytest_collection_modifyitems(config, items):
+    store = config.stash.get(duration_store_key, None)
+    if store is None or not config.getoption("--longest-first") or config.getoption("--shards") > 1:
+        return
+    by_id = {item.nodeid: item for item in items}
+    items[:] = [by_id[nodeid] for nodeid in longest_first(list(by_id), store.estimates())]
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call":
+        # Logging is asynchronous: write the test's log lines before its outcome is reported
+        custom_logger.flush()
+    test_durations[report.nodeid] = test_durations.get(report.nodeid, 0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    store = session.config.stash.get(duration_store_key, None)
+    if store is None or not test_durations:
+        return
+    for nodeid, seconds in test_durations.items():
+        store.record(nodeid, seconds)
+    store.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    prefetch = config.stash.get(prefetch_stats_key, None)
+    if prefetch:
+        stored, planned, elapsed = prefetch
+        terminalreporter.section("prefetch")
+        terminalreporter.write_line(f"{stored}/{planned} responses prefetched in {elapsed:.3f}s")
+    shard_stats = config.stash.get(shard_stats_key, [])
+    if shard_stats:
+        terminalreporter.section("shards")
+        for index, count, elapsed, returncode in sorted(shard_stats):
+            terminalreporter.write_line(f"worker {index}: {count} tests in {elapsed:.2f}s (exit code {returncode})")
+    if api.cache.enabled:
+        terminalreporter.section("response cache")
+        terminalreporter.write_line(f"{api.cache.hits} hits, {api.cache.misses} misses")
+    slo_results = config.stash.get(latency_slo_results_key, [])
+    if slo_results:
+        terminalreporter.section("latency SLOs")
+        for nodeid, outcome, distribution in slo_results:
+            terminalreporter.write_line(f"{outcome} {nodeid}: {distribution}")
+    if api.latencies.histograms:
+        terminalreporter.section("request latency")
+        for line in api.latencies.report_lines():
+            terminalreporter.write_line(line)
+    for title, recorder in (("test", phases_by_test), ("customer", phases_by_customer)):
+        if recorder.groups:
+            terminalreporter.section(f"request phases by {title}")
+            width = max(len(title), *(len(str(group)) for group in recorder.groups))
+            for line in recorder.report_lines(title, width):
+                terminalreporter.write_line(line)
+    stats = config.stash.get(connection_stats_key, {})
+    if not stats:
+        return
+    terminalreporter.section("connection reuse")
+    for host, entry in stats.items():
+        terminalreporter.write_line(f"{host}: {entry['requests']} requests over "
+                                    f"{entry['connections']} connections ({entry['reused']} reused)")
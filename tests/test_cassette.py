@@ -0,0 +1,137 @@
+import io
+import json
+
+import pytest
+import requests
+
+from utils.cassette import Cassette, CassetteMiss, build_response, cassette_key, response_entry
+from utils.json_stream import iter_array
+
+PARAMS = {"customerId": "abc", "categoryId": 3, "includePending": True}
+BODY = '[{"transactionId": "tx-1", "merchantName": "Café"}, {"transactionId": "tx-2"}]'
+
+
+def make_response(body=BODY, status=200, streamed=False):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "OK"
+    response.headers["content-type"] = "application/json"
+    response.encoding = "utf-8"
+    response.raw = io.BytesIO(body.encode())
+    response.streamed = streamed
+    return response
+
+
+def saved(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["interactions"]
+
+
+class TestCassetteKey:
+    def test_order_and_types_do_not_matter(self):
+        assert cassette_key(PARAMS) == cassette_key({"includePending": "True", "categoryId": "3", "customerId": "abc"})
+        assert cassette_key(PARAMS) == "categoryId=3&customerId=abc&includePending=True"
+
+    def test_different_queries(self):
+        assert cassette_key({"categoryId": 3}) != cassette_key({"categoryId": 4})
+
+
+class TestResponseEntry:
+    def test_round_trip(self):
+        rebuilt = build_response(response_entry(make_response()), "http://example.test/transactions")
+        assert rebuilt.status_code == 200
+        assert rebuilt.headers["Content-Type"] == "application/json"
+        assert rebuilt.json()[0]["merchantName"] == "Café"
+        assert rebuilt.url == "http://example.test/transactions"
+
+
+class TestCassette:
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            Cassette(str(tmp_path / "c.json"), "rewind")
+
+    def test_off(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json"))
+        assert not cassette.plays and not cassette.records
+
+    def test_record_then_replay(self, tmp_path):
+        path = str(tmp_path / "cassettes" / "c.json")
+        recorder = Cassette(path, "record")
+        assert recorder.records and not recorder.plays
+        recorder.record(PARAMS, make_response())
+        recorder.record({"customerId": "missing"}, make_response('"Customer not found"', 404))
+        recorder.save()
+        assert len(saved(path)) == 2
+
+        player = Cassette(path, "replay")
+        assert player.plays and not player.records
+        response = player.play(dict(reversed(list(PARAMS.items()))))
+        assert response.status_code == 200
+        assert [tx["transactionId"] for tx in response.json()] == ["tx-1", "tx-2"]
+        assert player.play({"customerId": "missing"}).status_code == 404
+
+    def test_replay_miss_raises(self, tmp_path):
+        player = Cassette(str(tmp_path / "c.json"), "replay")
+        with pytest.raises(CassetteMiss):
+            player.play(PARAMS)
+
+    def test_record_does_not_load_the_file(self, tmp_path):
+        path = str(tmp_path / "c.json")
+        first = Cassette(path, "record")
+        first.record(PARAMS, make_response())
+        first.save()
+        assert Cassette(path, "record").interactions == {}
+
+    def test_hybrid(self, tmp_path):
+        path = str(tmp_path / "c.json")
+        first = Cassette(path, "record")
+        first.record(PARAMS, make_response())
+        first.save()
+
+        hybrid = Cassette(path, "hybrid")
+        assert hybrid.plays and hybrid.records
+        assert hybrid.play(PARAMS).status_code == 200
+        assert hybrid.play({"customerId": "new"}) is None
+        hybrid.record({"customerId": "new"}, make_response("[]"))
+        hybrid.save()
+        assert sorted(saved(path)) == sorted([cassette_key(PARAMS), cassette_key({"customerId": "new"})])
+
+    def test_save_only_when_something_was_recorded(self, tmp_path):
+        path = tmp_path / "c.json"
+        Cassette(str(path), "record").save()
+        assert not path.exists()
+
+
+class TestStreamedRecording:
+    def test_body_is_not_read_when_recorded(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json"), "record")
+        response = make_response(streamed=True)
+        cassette.record(PARAMS, response)
+        assert response.raw.tell() == 0
+        assert cassette.interactions == {}
+
+    def test_recorded_once_read_to_the_end(self, tmp_path):
+        path = str(tmp_path / "c.json")
+        cassette = Cassette(path, "record")
+        response = make_response(streamed=True)
+        cassette.record(PARAMS, response)
+        items = list(iter_array(response.iter_content(7)))
+        assert [tx["transactionId"] for tx in items] == ["tx-1", "tx-2"]
+        cassette.save()
+        assert Cassette(path, "replay").play(PARAMS).json() == items
+
+    def test_recorded_when_read_whole(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json"), "record")
+        response = make_response(streamed=True)
+        cassette.record(PARAMS, response)
+        assert response.json()[1]["transactionId"] == "tx-2"
+        assert cassette.interactions[cassette_key(PARAMS)]["body"] == BODY
+
+    def test_partial_body_is_not_recorded(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json"), "record")
+        response = make_response(streamed=True)
+        cassette.record(PARAMS, response)
+        items = iter_array(response.iter_content(7))
+        next(items)
+        items.close()
+        assert cassette.interactions == {}
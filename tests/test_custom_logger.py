@@ -0,0 +1,62 @@
+import io
+import logging
+import threading
+
+from utils import custom_logger
+from utils.custom_logger import BASE_LOGGER, AsyncHandler, BatchingListener, customLogger
+
+
+def async_handlers(logger):
+    return [handler for handler in logger.handlers if isinstance(handler, AsyncHandler)]
+
+
+def listener_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "log-listener"]
+
+
+class TestCustomLogger:
+    def test_repeated_calls_are_idempotent(self, monkeypatch):
+        base = logging.getLogger(BASE_LOGGER)
+        first = customLogger("tests.test_custom_logger")
+        # Also without the name cache, as a fresh worker process importing another module would call it
+        monkeypatch.setattr(custom_logger, "_loggers", {})
+        second = customLogger("tests.test_custom_logger")
+        other = customLogger("tests.other")
+        assert first is second
+        assert first.name == f"{BASE_LOGGER}.tests.test_custom_logger"
+        assert other.name == f"{BASE_LOGGER}.tests.other"
+        assert customLogger() is base
+        assert len(async_handlers(base)) == 1
+        assert first.handlers == [] and other.handlers == []
+        assert custom_logger.get_listener() is custom_logger.get_listener()
+        assert len(listener_threads()) == 1
+
+    def test_root_logger_is_left_alone(self):
+        customLogger("tests.test_custom_logger")
+        assert not async_handlers(logging.getLogger())
+        assert logging.getLogger(BASE_LOGGER).propagate
+
+
+class TestBatchingListener:
+    def test_writes_queued_records_in_order(self):
+        stream = io.StringIO()
+        listener = BatchingListener(stream, batch_size=3).start()
+        logger = logging.Logger("tests.batching")
+        logger.addHandler(AsyncHandler(listener.records))
+        for index in range(10):
+            logger.info("line %d", index)
+        listener.flush()
+        assert stream.getvalue() == "".join(f"line {index}\n" for index in range(10))
+        listener.stop()
+        listener.stop()
+
+    def test_arguments_are_merged_when_logged(self):
+        stream = io.StringIO()
+        listener = BatchingListener(stream).start()
+        logger = logging.Logger("tests.batching")
+        logger.addHandler(AsyncHandler(listener.records))
+        values = [1]
+        logger.info("values %s", values)
+        values.append(2)
+        listener.stop()
+        assert stream.getvalue() == "values [1]\n"
@@ -0,0 +1,60 @@
+import json
+
+from utils.durations import SMOOTHING, DurationStore, fill_unknown, longest_first
+
+
+class TestFillUnknown:
+    def test_unknown_tests_count_as_the_median(self):
+        durations = {"a": 1.0, "b": 5.0, "c": 3.0, "gone": 100.0}
+        assert fill_unknown(["a", "b", "c", "d"], durations) == {"a": 1.0, "b": 5.0, "c": 3.0, "d": 3.0}
+
+    def test_one_second_without_history(self):
+        assert fill_unknown(["a", "b"], {}) == {"a": 1.0, "b": 1.0}
+
+
+class TestLongestFirst:
+    def test_slowest_first(self):
+        assert longest_first(["a", "b", "c"], {"a": 1.0, "b": 3.0, "c": 2.0}) == ["b", "c", "a"]
+
+    def test_ties_keep_collection_order(self):
+        assert longest_first(["c", "a", "b", "d"], {"a": 2.0, "b": 2.0, "c": 2.0, "d": 5.0}) == ["d", "c", "a", "b"]
+
+    def test_unknown_tests(self):
+        durations = {"slow": 4.0, "medium": 2.0, "fast": 1.0}
+        assert longest_first(["new", "slow", "fast", "medium"], durations) == ["slow", "new", "medium", "fast"]
+
+
+class TestDurationStore:
+    def test_missing_file_is_empty(self, tmp_path):
+        store = DurationStore(str(tmp_path / "durations.json"))
+        assert store.tests == {}
+        assert store.estimates() == {}
+
+    def test_smoothing(self, tmp_path):
+        store = DurationStore(str(tmp_path / "durations.json"))
+        store.record("a", 2.0)
+        assert store.tests["a"] == {"last": 2.0, "smoothed": 2.0, "runs": 1}
+        store.record("a", 4.0)
+        assert store.tests["a"] == {"last": 4.0, "smoothed": SMOOTHING * 4.0 + (1 - SMOOTHING) * 2.0, "runs": 2}
+
+    def test_save_and_reload(self, tmp_path):
+        path = tmp_path / "history" / "durations.json"
+        store = DurationStore(str(path))
+        store.record("tests/test_a.py::test_one[Customer1]", 1.5)
+        store.record("tests/test_a.py::test_two", 0.25)
+        store.save()
+        assert not [name for name in path.parent.iterdir() if name.name.endswith(".tmp")]
+
+        reloaded = DurationStore(str(path))
+        assert reloaded.tests == store.tests
+        assert reloaded.estimates() == {"tests/test_a.py::test_one[Customer1]": 1.5, "tests/test_a.py::test_two": 0.25}
+        reloaded.record("tests/test_a.py::test_two", 0.75)
+        reloaded.save()
+        assert json.loads(path.read_text())["tests"]["tests/test_a.py::test_two"]["runs"] == 2
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "durations.json"
+        path.write_text('{"version": 1, "tests": {')
+        assert DurationStore(str(path)).tests == {}
+        path.write_text('{"version": 1}')
+        assert DurationStore(str(path)).tests == {}
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+from jsonschema import FormatChecker
+
+from utils.fast_validator import compile_schema
+from utils.schema import transaction_schema
+from utils.validation import format_checker, is_valid_transaction, transaction_validator
+
+VALID_TRANSACTION = {
+    "transactionId": "7f1c2e3a-4b5c-4a6e-9f7d-b3c8f5d24c0b",
+    "amount": -12.5,
+    "currency": "GBP",
+    "merchantName": "Coffee Shop",
+    "timestamp": "2025-06-05T08:15:00Z",
+    "type": "Debit",
+    "subType": "CardPayment",
+    "status": "Booked",
+    "categoryId": 11,
+    "description": "Flat white",
+}
+
+# Values swapped into fields: other JSON types, enum and range edges, and timestamp shapes
+MUTATIONS = (
+    None, True, False, 0, 1, 20, 21, -1, 1.0, 20.0, 2.5, float("nan"), 10 ** 20, "", "x", "Debit", "Credit",
+    "Pending", "Booked", "2025-06-05T08:15:00Z", "2025-06-05T08:15:00.123+01:00", "2025-06-05 08:15:00",
+    "2025/06/05 08:15:00", "2025-06-05", [], {}, ["GBP"],
+)
+
+
+def mutated_transactions(seed=0, combined=2000):
+    """
+    Every single-field mutation of VALID_TRANSACTION (missing, extra and swapped values), then random
+    combinations of up to three of them.
+    """
+    single = []
+    for key in VALID_TRANSACTION:
+        single.append({k: v for k, v in VALID_TRANSACTION.items() if k != key})
+        single.extend(dict(VALID_TRANSACTION, **{key: value}) for value in MUTATIONS)
+    single.append(dict(VALID_TRANSACTION, unexpected="field"))
+    yield from single
+    rng = random.Random(seed)
+    keys = list(VALID_TRANSACTION) + ["unexpected"]
+    for _ in range(combined):
+        tx = dict(VALID_TRANSACTION)
+        for key in rng.sample(keys, rng.randint(1, 3)):
+            if rng.random() < 0.2:
+                tx.pop(key, None)
+            else:
+                tx[key] = rng.choice(MUTATIONS)
+        yield tx
+
+
+class TestCompiledValidator:
+    def test_accepts_valid_transaction(self):
+        assert is_valid_transaction(VALID_TRANSACTION)
+        assert not list(transaction_validator.iter_errors(VALID_TRANSACTION))
+
+    @pytest.mark.parametrize("instance", [None, [], "transaction", 1, [VALID_TRANSACTION]])
+    def test_rejects_non_objects(self, instance):
+        assert not is_valid_transaction(instance)
+        assert list(transaction_validator.iter_errors(instance))
+
+    def test_matches_jsonschema_on_mutations(self):
+        """
+        The compiled validator rejects exactly the transactions jsonschema reports errors for.
+        """
+        mismatches = []
+        for tx in mutated_transactions():
+            errors = [error.message for error in transaction_validator.iter_errors(tx)]
+            if is_valid_transaction(tx) != (not errors):
+                mismatches.append((tx, errors))
+        assert not mismatches, f"{len(mismatches)} disagreements, first: {mismatches[0]}"
+
+    def test_matches_jsonschema_without_format_checker(self):
+        """
+        Without a format checker "date-time" is not enforced by either validator.
+        """
+        is_valid = compile_schema(transaction_schema)
+        validator_class = type(transaction_validator)
+        validator = validator_class(transaction_schema)
+        for tx in mutated_transactions(seed=1, combined=500):
+            assert is_valid(tx) == validator.is_valid(tx), tx
+
+    def test_format_checker_is_used(self):
+        checker = FormatChecker(formats=())
+        is_valid = compile_schema(transaction_schema, checker)
+        assert is_valid(dict(VALID_TRANSACTION, timestamp="not a timestamp"))
+        assert not compile_schema(transaction_schema, format_checker)(
+            dict(VALID_TRANSACTION, timestamp="not a timestamp"))
+
+    @pytest.mark.parametrize("schema", [
+        {"type": "array"},
+        {"type": "object", "properties": {"a": {"type": "string", "pattern": "^a"}}},
+        {"type": "object", "properties": {"a": {"type": "object", "properties": {}}}},
+        {"type": "object", "properties": {"a": {"enum": [1, 2]}}},
+        {"type": "object", "additionalProperties": {"type": "string"}},
+    ])
+    def test_rejects_unsupported_schemas(self, schema):
+        with pytest.raises(ValueError):
+            compile_schema(schema)
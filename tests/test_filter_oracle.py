@@ -0,0 +1,138 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from utils.filter_oracle import FilterOracle, filters_for
+
+
+def transaction(number, category_id, status, timestamp):
+    return {"transactionId": f"tx-{number}", "categoryId": category_id, "status": status, "timestamp": timestamp}
+
+
+TRANSACTIONS = [
+    transaction(1, 3, "Pending", "2025-06-05T09:00:00Z"),
+    transaction(2, 11, "Booked", "2025-06-05T08:15:00Z"),
+    transaction(3, 3, "Booked", "2025-06-04T23:30:00-02:00"),   # 5 June UTC, 4 June in its own offset
+    transaction(4, 11, "Booked", "2025-06-03T12:00:00Z"),
+    transaction(5, 7, "Booked", "not a timestamp"),
+    transaction(6, 3, "Booked", "2025-06-01T00:00:00Z"),
+]
+
+
+def ids(transactions):
+    return [tx["transactionId"] for tx in transactions]
+
+
+def brute_force(transactions, category_id=None, include_pending=True, from_date=None, to_date=None):
+    """
+    The endpoint's filter rules applied to every transaction in turn.
+    """
+    matching = []
+    for tx in transactions:
+        if category_id is not None and tx["categoryId"] != category_id:
+            continue
+        if not include_pending and tx["status"] == "Pending":
+            continue
+        if from_date is not None or to_date is not None:
+            try:
+                day = date.fromisoformat(tx["timestamp"][:10])
+            except ValueError:
+                continue
+            if (from_date is not None and day < from_date) or (to_date is not None and day > to_date):
+                continue
+        matching.append(tx)
+    return matching
+
+
+class TestFiltersFor:
+    def test_raw_and_built_params(self):
+        expected = (3, False, date(2025, 6, 1), date(2025, 6, 5))
+        assert filters_for({"categoryId": "3", "includePending": "False", "fromDate": "2025-06-01",
+                            "toDate": "2025-06-05"}) == expected
+        assert filters_for({"categoryId": 3, "includePending": False, "fromDate": date(2025, 6, 1),
+                            "toDate": date(2025, 6, 5)}) == expected
+
+    def test_defaults(self):
+        assert filters_for({"customerId": "abc"}) == (None, True, None, None)
+
+    @pytest.mark.parametrize("params", [{"categoryId": "abc"}, {"fromDate": "2025-13-01"}, {"toDate": "today"}])
+    def test_invalid(self, params):
+        with pytest.raises(ValueError):
+            filters_for(params)
+
+
+class TestFilterOracle:
+    @pytest.mark.parametrize("params, expected", [
+        ({}, ["tx-1", "tx-2", "tx-3", "tx-4", "tx-5", "tx-6"]),
+        ({"categoryId": "3"}, ["tx-1", "tx-3", "tx-6"]),
+        ({"categoryId": 3, "includePending": False}, ["tx-3", "tx-6"]),
+        ({"includePending": "false"}, ["tx-2", "tx-3", "tx-4", "tx-5", "tx-6"]),
+        ({"fromDate": "2025-06-04", "toDate": "2025-06-04"}, ["tx-3"]),
+        ({"fromDate": "2025-06-05"}, ["tx-1", "tx-2"]),
+        ({"toDate": date(2025, 6, 3)}, ["tx-4", "tx-6"]),
+        ({"fromDate": "2025-06-05", "toDate": "2025-06-01"}, []),
+        ({"categoryId": "20"}, []),
+    ])
+    def test_expected(self, params, expected):
+        assert ids(FilterOracle(TRANSACTIONS).expected(params)) == expected
+
+    def test_date_range_skips_unparseable_timestamps(self):
+        assert FilterOracle(TRANSACTIONS).date_range() == (date(2025, 6, 1), date(2025, 6, 5))
+        assert FilterOracle([]).date_range() is None
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        start = date(2025, 1, 1)
+        transactions = [
+            transaction(i, rng.randint(1, 5), rng.choice(("Pending", "Booked")),
+                        f"{start + timedelta(days=rng.randrange(60))}T{rng.randrange(24):02d}:00:00Z")
+            for i in range(300)
+        ]
+        oracle = FilterOracle(transactions)
+        dates = [None] + [start + timedelta(days=offset) for offset in range(-1, 62, 7)]
+        for category_id in (None, 1, 3, 5, 6):
+            for include_pending in (True, False):
+                for from_date in dates:
+                    for to_date in dates:
+                        filters = (category_id, include_pending, from_date, to_date)
+                        expected = brute_force(transactions, *filters)
+                        assert oracle.positions(*filters) == [int(tx["transactionId"][3:]) for tx in expected]
+
+
+class TestFilterDiff:
+    def test_no_difference(self):
+        oracle = FilterOracle(TRANSACTIONS)
+        diff = oracle.diff({"categoryId": "3"}, oracle.expected({"categoryId": "3"}))
+        assert not diff
+        assert str(diff) == "no difference"
+
+    def test_finds_missing_transactions(self):
+        oracle = FilterOracle(TRANSACTIONS)
+        diff = oracle.diff({"categoryId": "3"}, [TRANSACTIONS[0], TRANSACTIONS[5]])
+        assert diff
+        assert diff.missing == ["tx-3"]
+        assert diff.unexpected == []
+        assert not diff.misordered
+        assert str(diff) == "missing 1: tx-3"
+
+    def test_finds_extra_transactions(self):
+        oracle = FilterOracle(TRANSACTIONS)
+        diff = oracle.diff({"includePending": "false"}, TRANSACTIONS)
+        assert diff.missing == []
+        assert diff.unexpected == ["tx-1"]
+        assert str(diff) == "unexpected 1: tx-1"
+
+    def test_finds_missing_and_extra_transactions(self):
+        oracle = FilterOracle(TRANSACTIONS)
+        diff = oracle.diff({"categoryId": "11"}, [TRANSACTIONS[1], TRANSACTIONS[4]])
+        assert diff.missing == ["tx-4"]
+        assert diff.unexpected == ["tx-5"]
+        assert not diff.misordered
+
+    def test_finds_misordered_transactions(self):
+        oracle = FilterOracle(TRANSACTIONS)
+        diff = oracle.diff({"categoryId": "3"}, [TRANSACTIONS[2], TRANSACTIONS[0], TRANSACTIONS[5]])
+        assert diff.missing == diff.unexpected == []
+        assert diff.misordered
+        assert str(diff) == "returned in a different order than the unfiltered list"
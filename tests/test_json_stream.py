@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from utils.json_stream import iter_array, iter_json_array
+
+DOCUMENTS = [
+    "[]",
+    " [ ] \n",
+    "[[]]",
+    "[{}]",
+    '[1, -2.5e3, true, false, null, "x", [], {}]',
+    '[{"a": [1, {"b": "c"}]}, 123456, 0.5]',
+    '[ "quote \\" backslash \\\\ slash \\/ controls \\b\\f\\n\\r\\t", "\\u00e9\\ud83d\\ude00", "]", ",", "[" ]',
+    '["café", "€", "\U0001f600"]',
+    "[\n  1 ,\n  2\n]\n",
+]
+
+
+def splits(data):
+    """
+    The data cut in two at every offset, including the empty chunk at either end.
+    """
+    for offset in range(len(data) + 1):
+        yield [data[:offset], data[offset:]]
+
+
+class TestIterArray:
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    def test_split_at_every_byte_offset(self, document):
+        """
+        UTF-8 bytes are cut inside numbers, literals, escapes and multi-byte characters alike.
+        """
+        expected = json.loads(document)
+        data = document.encode()
+        for chunks in splits(data):
+            assert list(iter_array(chunks)) == expected, chunks
+        assert list(iter_array(data[i:i + 1] for i in range(len(data)))) == expected
+
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    def test_str_chunks(self, document):
+        for chunks in splits(document):
+            assert list(iter_array(chunks)) == json.loads(document)
+
+    @pytest.mark.parametrize("chunks", [[b"[]"], [b"", b"[]", b""], [b"[", b"]"], [b" ", b"[", b" ", b"]", b" "]])
+    def test_empty_array(self, chunks):
+        assert list(iter_array(chunks)) == []
+
+    def test_yields_items_before_the_array_ends(self):
+        def chunks():
+            yield b'[{"a": 1}, '
+            raise AssertionError("read past the first item")
+
+        assert next(iter_array(chunks())) == {"a": 1}
+
+    @pytest.mark.parametrize("document", [
+        "[1]garbage",
+        "[1] 2",
+        "[1]]",
+        "[1][2]",
+        "[] x",
+        "[]\n{}",
+        '[1] "',
+    ])
+    def test_rejects_trailing_data(self, document):
+        for chunks in splits(document.encode()):
+            with pytest.raises(ValueError):
+                list(iter_array(chunks))
+
+    @pytest.mark.parametrize("document", [
+        "",
+        "   ",
+        "{}",
+        '"[]"',
+        "[",
+        "[1",
+        "[1,",
+        "[1,]",
+        "[,1]",
+        "[1 2]",
+        "[tru]",
+        "[1.]",
+        '["unterminated]',
+        '["bad escape \\x"]',
+    ])
+    def test_rejects_invalid_documents(self, document):
+        for chunks in splits(document.encode()):
+            with pytest.raises(ValueError):
+                list(iter_array(chunks))
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 64 * 1024])
+    def test_round_trip(self, chunk_size):
+        items = [{"id": i, "name": f"item {i}", "tags": ["a", "é"] * (i % 3)} for i in range(200)]
+        chunks = list(iter_json_array(items, chunk_size))
+        assert json.loads(b"".join(chunks)) == items
+        assert list(iter_array(chunks)) == items
@@ -0,0 +1,135 @@
+import math
+import random
+
+import pytest
+
+from utils.latency import LatencyHistogram, LatencyRecorder
+
+
+def exact_percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)), 1) - 1]
+
+
+def random_latencies(seed, count=20_000):
+    rng = random.Random(seed)
+    # Log-normal like real latencies: most around a millisecond, a long tail up to seconds
+    return [int(min(rng.lognormvariate(7, 1.5), 10_000_000)) for _ in range(count)]
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize("significant_digits", [2, 3])
+    def test_percentile_error_bound(self, significant_digits):
+        """
+        A percentile is never below the exact value and at most 10^-digits above it (relative).
+        """
+        values = random_latencies(significant_digits)
+        histogram = LatencyHistogram(significant_digits)
+        for value in values:
+            histogram.record(value)
+        for q in (0.1, 1, 10, 25, 50, 75, 90, 95, 99, 99.9, 99.99, 100):
+            exact = exact_percentile(values, q)
+            reported = histogram.percentile(q)
+            assert exact <= reported <= exact * (1 + 10 ** -significant_digits), (q, exact, reported)
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 2001):
+            histogram.record(value)
+        assert histogram.percentile(50) == 1000
+        assert histogram.percentile(100) == 2000
+        assert histogram.min == 1
+        assert histogram.max == 2000
+        assert histogram.mean() == 1000.5
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(99) == 0
+        assert histogram.mean() == 0
+        assert histogram.min is None
+
+    def test_merge_is_exact(self):
+        values = random_latencies(7)
+        whole = LatencyHistogram()
+        parts = [LatencyHistogram() for _ in range(4)]
+        for i, value in enumerate(values):
+            whole.record(value)
+            parts[i % 4].record(value)
+        merged = LatencyHistogram()
+        for part in parts:
+            merged.merge(part)
+        assert merged.counts == whole.counts
+        assert (merged.total, merged.sum, merged.min, merged.max) == (whole.total, whole.sum, whole.min, whole.max)
+        for q in (50, 90, 99, 99.9):
+            assert merged.percentile(q) == whole.percentile(q)
+
+    def test_merge_into_empty_and_from_empty(self):
+        histogram = LatencyHistogram()
+        histogram.record(1500)
+        assert LatencyHistogram().merge(histogram).to_dict() == histogram.to_dict()
+        assert histogram.merge(LatencyHistogram()).min == 1500
+
+    def test_merge_rejects_different_precision(self):
+        with pytest.raises(ValueError):
+            LatencyHistogram(3).merge(LatencyHistogram(2))
+
+    def test_dict_round_trip(self):
+        histogram = LatencyHistogram()
+        for value in random_latencies(3, 1000):
+            histogram.record(value)
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+        assert restored.to_dict() == histogram.to_dict()
+        assert restored.percentile(99) == histogram.percentile(99)
+
+    def test_coordinated_omission_correction(self):
+        """
+        A 10 ms response at a 1 ms interval hid 9 requests, which would have waited 9, 8, ..., 1 ms.
+        """
+        histogram = LatencyHistogram()
+        histogram.record_corrected(10_000, 1_000)
+        assert histogram.total == 10
+        assert histogram.sum == sum(range(1_000, 10_001, 1_000))
+        assert (histogram.min, histogram.max) == (1_000, 10_000)
+
+    @pytest.mark.parametrize("microseconds, interval, samples", [
+        (999, 1_000, 1),
+        (1_000, 1_000, 1),
+        (1_999, 1_000, 1),
+        (2_000, 1_000, 2),
+        (10_000, 0, 1),
+    ])
+    def test_coordinated_omission_correction_edges(self, microseconds, interval, samples):
+        histogram = LatencyHistogram()
+        histogram.record_corrected(microseconds, interval)
+        assert histogram.total == samples
+
+
+class TestLatencyRecorder:
+    def test_corrected_recording_in_seconds(self):
+        recorder = LatencyRecorder()
+        recorder.record("plain", 0.010, expected_interval=0.001)
+        recorder.record("plain", 0.0005)
+        assert recorder.histograms["plain"].total == 11
+
+    def test_merge_and_combined(self):
+        first, second = LatencyRecorder(), LatencyRecorder()
+        first.record("plain", 0.001)
+        second.record("plain", 0.002)
+        second.record("categoryId", 0.004)
+        merged = first.merge(second)
+        assert merged.histograms["plain"].total == 2
+        assert merged.combined().total == 3
+        assert merged.combined().max == 4000
+
+    def test_report_lines_are_aligned(self):
+        recorder = LatencyRecorder()
+        recorder.record("plain", 0.001)
+        recorder.record("categoryId+fromDate+includePending+toDate", 0.002)
+        lines = recorder.report_lines()
+        assert [line.split()[0] for line in lines] == ["variant", "categoryId+fromDate+includePending+toDate",
+                                                       "plain", "all"]
+        # The count column ends at the same offset on every line, header included
+        assert len({line.index(line.split()[1]) + len(line.split()[1]) for line in lines}) == 1
+
+    def test_report_lines_empty(self):
+        assert len(LatencyRecorder().report_lines()) == 1
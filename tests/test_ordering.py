@@ -0,0 +1,110 @@
+import pytest
+
+from utils.ordering import OrderingViolation, check_ordering
+
+
+def transactions(*rows):
+    """
+    Transactions from (status, timestamp) pairs, with IDs tx-0, tx-1, ...
+    """
+    return [{"transactionId": f"tx-{index}", "status": status, "timestamp": timestamp}
+            for index, (status, timestamp) in enumerate(rows)]
+
+
+class TestCheckOrdering:
+    @pytest.mark.parametrize("rows", [
+        (),
+        (("Booked", "2025-06-05T08:15:00Z"),),
+        (("Pending", "2025-06-05T08:15:00Z"),),
+    ])
+    def test_empty_and_single(self, rows):
+        assert check_ordering(transactions(*rows)) == []
+
+    def test_descending(self):
+        assert check_ordering(transactions(
+            ("Pending", "2025-06-06T10:00:00Z"),
+            ("Pending", "2025-06-06T09:00:00Z"),
+            # Booked timestamps are compared among themselves, not with the Pending ones
+            ("Booked", "2025-06-07T08:00:00Z"),
+            ("Booked", "2025-06-05T09:15:00+01:00"),
+            ("Booked", "2025-06-04T08:15:00Z"),
+        )) == []
+
+    def test_ties(self):
+        assert check_ordering(transactions(
+            ("Booked", "2025-06-05T08:15:00Z"),
+            ("Booked", "2025-06-05T08:15:00Z"),
+            # The same instant in another offset
+            ("Booked", "2025-06-05T09:15:00+01:00"),
+        )) == []
+
+    def test_ascending(self):
+        violations = check_ordering(transactions(
+            ("Booked", "2025-06-03T08:15:00Z"),
+            ("Booked", "2025-06-04T08:15:00Z"),
+            ("Booked", "2025-06-05T08:15:00Z"),
+        ))
+        assert [violation.index for violation in violations] == [1, 2]
+        assert violations[0] == OrderingViolation(
+            1, "tx-1", "Booked timestamp 2025-06-04T08:15:00Z is newer than the one at index 0")
+        assert str(violations[0]).startswith("[1] tx-1: Booked timestamp")
+
+    def test_first_out_of_order_index(self):
+        violations = check_ordering(transactions(
+            ("Booked", "2025-06-05T08:15:00Z"),
+            ("Booked", "2025-06-04T08:15:00Z"),
+            ("Booked", "2025-06-03T08:15:00Z"),
+            ("Booked", "2025-06-03T08:15:01Z"),
+            ("Booked", "2025-06-01T08:15:00Z"),
+        ))
+        assert [violation.index for violation in violations] == [3]
+        assert "index 2" in violations[0].message
+
+    def test_pending_after_booked(self):
+        violations = check_ordering(transactions(
+            ("Pending", "2025-06-06T08:15:00Z"),
+            ("Booked", "2025-06-05T08:15:00Z"),
+            ("Pending", "2025-06-04T08:15:00Z"),
+        ))
+        assert violations == [OrderingViolation(2, "tx-2", "Pending transaction after non-Pending one at index 1")]
+
+    def test_other_statuses_end_the_pending_group(self):
+        violations = check_ordering(transactions(
+            ("Rejected", "2025-06-01T08:15:00Z"),
+            ("Booked", "2025-06-05T08:15:00Z"),
+            ("Pending", "2025-06-06T08:15:00Z"),
+        ))
+        assert [violation.index for violation in violations] == [2]
+
+    def test_unparseable_timestamp(self):
+        violations = check_ordering(transactions(
+            ("Booked", "2025-06-05T08:15:00Z"),
+            ("Booked", "yesterday"),
+            ("Booked", None),
+            ("Booked", "2025-06-04T08:15:00Z"),
+        ))
+        assert [violation.index for violation in violations] == [1, 2]
+        assert violations[0].message == "Unparseable timestamp 'yesterday'"
+
+    def test_lenient_timestamps_are_ordered(self):
+        violations = check_ordering(transactions(
+            ("Booked", "2025/06/05 08:15:00"),
+            ("Booked", "2025-06-05T08:15:01Z"),
+        ))
+        assert [violation.index for violation in violations] == [1]
+
+    def test_max_violations(self):
+        rows = [("Booked", f"2025-06-{day:02d}T08:15:00Z") for day in range(1, 29)]
+        assert len(check_ordering(transactions(*rows))) == 10
+        assert [violation.index for violation in check_ordering(transactions(*rows), max_violations=3)] == [1, 2, 3]
+
+    def test_stops_reading_at_max_violations(self):
+        read = []
+
+        def stream():
+            for transaction in transactions(*[("Booked", f"2025-06-{day:02d}T08:15:00Z") for day in range(1, 29)]):
+                read.append(transaction)
+                yield transaction
+
+        assert len(check_ordering(stream(), max_violations=2)) == 2
+        assert len(read) == 3
@@ -0,0 +1,80 @@
+import pytest
+
+from utils.query_fuzz import QueryFuzzer, problem_kind, shrink, simplifications
+
+
+class TestSimplifications:
+    def test_drops_parameters_first(self):
+        params = {"customerId": "abcd", "categoryId": "12"}
+        variants = list(simplifications(params))
+        assert variants[:2] == [{"categoryId": "12"}, {"customerId": "abcd"}]
+        assert {"customerId": "ab", "categoryId": "12"} in variants
+        assert {"customerId": "abcd", "categoryId": "2"} in variants
+
+    def test_never_yields_the_query_itself(self):
+        params = {"includePending": "", "categoryId": "1"}
+        assert params not in list(simplifications(params))
+
+    def test_empty_query(self):
+        assert list(simplifications({})) == []
+
+
+class TestShrink:
+    def test_reaches_a_local_minimum(self):
+        """
+        A query fails while categoryId holds a "9": the minimum is categoryId alone, shortened to "9".
+        """
+        def fails(params):
+            return "9" in params.get("categoryId", "")
+
+        params = {"customerId": "0123-4567", "categoryId": "1999", "includePending": "true", "toDate": "2025-06-05"}
+        minimal, tries = shrink(params, fails, max_steps=1000)
+        assert minimal == {"categoryId": "9"}
+        assert tries < 1000
+        # Local minimum: no simplification of the result still fails
+        assert not any(fails(candidate) for candidate in simplifications(minimal))
+
+    def test_keeps_parameters_that_fail_together(self):
+        def fails(params):
+            return "customerId" in params and params.get("fromDate", "") > params.get("toDate", "~")
+
+        minimal, _ = shrink({"customerId": "abc", "fromDate": "2025-06-05", "toDate": "2025-06-01",
+                             "categoryId": "3"}, fails, max_steps=1000)
+        assert set(minimal) == {"customerId", "fromDate", "toDate"}
+        assert fails(minimal)
+        assert not any(fails(candidate) for candidate in simplifications(minimal))
+
+    @pytest.mark.parametrize("max_steps", [0, 1, 5, 20])
+    def test_stops_after_max_steps(self, max_steps):
+        calls = []
+
+        def fails(params):
+            calls.append(params)
+            return True
+
+        _, tries = shrink({"customerId": "x" * 50, "categoryId": "12345"}, fails, max_steps)
+        assert tries == len(calls) <= max_steps
+
+    def test_returns_the_query_when_nothing_simpler_fails(self):
+        params = {"customerId": "abc", "categoryId": "3"}
+        minimal, tries = shrink(params, lambda candidate: False)
+        assert minimal == params
+        assert tries == len(list(simplifications(params)))
+
+
+class TestQueryFuzzer:
+    def test_same_seed_same_queries(self):
+        first, second = QueryFuzzer(seed=5), QueryFuzzer(seed=5)
+        assert [first.case() for _ in range(200)] == [second.case() for _ in range(200)]
+
+    def test_queries_are_strings(self):
+        fuzzer = QueryFuzzer(seed=1)
+        for _ in range(500):
+            assert all(isinstance(value, str) for value in fuzzer.case().values())
+
+
+class TestProblemKind:
+    def test_drops_the_details(self):
+        problem = "status 500, expected one of (200, 400, 404)"
+        assert problem_kind(problem) == problem
+        assert problem_kind("ConnectionError: reset by peer") == "ConnectionError"
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache
+from utils.transactions_api import query_key
+
+
+def response(status=200):
+    return SimpleNamespace(status_code=status)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A settable time.monotonic for the cache module.
+    """
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class TestQueryKey:
+    def test_parameter_order_does_not_matter(self):
+        assert query_key({"customerId": "a", "categoryId": 3}) == query_key({"categoryId": 3, "customerId": "a"})
+
+    def test_values_are_compared_as_strings(self):
+        assert query_key({"categoryId": 3, "includePending": True}) == \
+            query_key({"categoryId": "3", "includePending": "True"})
+
+    def test_different_queries(self):
+        assert query_key({"customerId": "a"}) != query_key({"customerId": "a", "categoryId": 3})
+        assert query_key({"customerId": "a"}) != query_key({"customerId": "b"})
+
+    def test_hashable(self):
+        assert {query_key({"customerId": "a", "toDate": "2025-06-05"}): 1}
+
+
+class TestResponseCache:
+    def test_hit_and_miss(self):
+        cache = ResponseCache()
+        key = query_key({"customerId": "a"})
+        assert cache.get(key) is None
+        stored = response()
+        cache.put(key, stored)
+        assert cache.get(query_key({"customerId": "a"})) is stored
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl_expiry(self, clock):
+        cache = ResponseCache(ttl=10.0)
+        cache.put("key", response())
+        clock.value += 9.9
+        assert cache.get("key") is not None
+        clock.value += 0.1
+        assert cache.get("key") is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_no_ttl(self, clock):
+        cache = ResponseCache(ttl=None)
+        cache.put("key", response())
+        clock.value += 10 ** 9
+        assert cache.get("key") is not None
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ResponseCache(enabled=False)
+        cache.put("key", response())
+        assert len(cache) == 0
+        assert cache.get("key") is None
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    @pytest.mark.parametrize("status, stored", [(200, True), (400, True), (404, True), (500, False), (503, False)])
+    def test_server_errors_are_not_stored(self, status, stored):
+        cache = ResponseCache()
+        cache.put("key", response(status))
+        assert (cache.get("key") is not None) == stored
+
+    def test_invalidate_customer(self):
+        cache = ResponseCache()
+        for params in ({"customerId": "a"}, {"customerId": "a", "categoryId": 3}, {"customerId": "b"}):
+            cache.put(query_key(params), response())
+        cache.invalidate("a")
+        assert len(cache) == 1
+        assert cache.get(query_key({"customerId": "b"})) is not None
+
+    def test_clear(self):
+        cache = ResponseCache()
+        cache.put("key", response())
+        cache.clear()
+        assert len(cache) == 0
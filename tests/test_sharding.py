@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+from _pytest.terminal import _get_raw_skip_reason
+
+from tests.conftest import replay_report
+from utils.sharding import RecordReader, partition, write_record
+
+NODEIDS = [f"tests/test_a.py::test_{index}" for index in range(10)]
+
+
+def loads(shards, durations):
+    return sorted(sum(durations[nodeid] for nodeid in shard) for shard in shards)
+
+
+class TestPartition:
+    def test_every_test_once(self):
+        durations = {nodeid: index + 1.0 for index, nodeid in enumerate(NODEIDS)}
+        shards = partition(NODEIDS, durations, 3)
+        assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(NODEIDS)
+
+    def test_balanced_loads(self):
+        """
+        Longest-processing-time-first on 1..10s over 3 shards: 55s in all, no shard above 19s.
+        """
+        durations = {nodeid: index + 1.0 for index, nodeid in enumerate(NODEIDS)}
+        assert loads(partition(NODEIDS, durations, 3), durations) == [18.0, 18.0, 19.0]
+
+    def test_slow_test_gets_its_own_shard(self):
+        durations = dict.fromkeys(NODEIDS, 1.0)
+        durations[NODEIDS[4]] = 100.0
+        shards = partition(NODEIDS, durations, 2)
+        assert [NODEIDS[4]] in shards
+
+    def test_collection_order_within_a_shard(self):
+        durations = {nodeid: float(index % 4) + 1 for index, nodeid in enumerate(NODEIDS)}
+        for shard in partition(NODEIDS, durations, 3):
+            assert shard == sorted(shard, key=NODEIDS.index)
+
+    def test_slowest_first_when_ordered(self):
+        durations = {nodeid: float(index % 4) + 1 for index, nodeid in enumerate(NODEIDS)}
+        for shard in partition(NODEIDS, durations, 3, ordered=True):
+            assert shard == sorted(shard, key=lambda nodeid: (-durations[nodeid], NODEIDS.index(nodeid)))
+
+    def test_stable(self):
+        durations = dict.fromkeys(NODEIDS, 2.0)
+        assert partition(NODEIDS, durations, 4) == partition(list(NODEIDS), dict(durations), 4)
+
+    def test_unknown_durations_count_as_the_median(self):
+        durations = {NODEIDS[0]: 10.0, NODEIDS[1]: 10.0, NODEIDS[2]: 1.0}
+        shards = partition(NODEIDS[:4], durations, 2)
+        # NODEIDS[3] is estimated at 10s, so it cannot share a shard with both 10s tests
+        assert loads(shards, {**durations, NODEIDS[3]: 10.0}) == [11.0, 20.0]
+
+    def test_no_history(self):
+        shards = partition(NODEIDS, {}, 3)
+        assert sorted(len(shard) for shard in shards) == [3, 3, 4]
+
+    @pytest.mark.parametrize("shards, expected", [(0, 1), (1, 1), (20, 3)])
+    def test_shard_count(self, shards, expected):
+        assert len(partition(NODEIDS[:3], {}, shards)) == expected
+
+    def test_no_tests(self):
+        assert partition([], {}, 4) == []
+
+
+class TestRecords:
+    def test_reader_returns_complete_records_only(self, tmp_path):
+        path = tmp_path / "reports.jsonl"
+        reader = RecordReader(str(path))
+        assert reader.read() == []
+        with open(path, "w", encoding="utf-8") as f:
+            write_record(f, "stats", {"a": 1})
+            f.write('{"kind": "report", ')
+            f.flush()
+            assert reader.read() == [{"kind": "stats", "data": {"a": 1}}]
+            f.write('"data": {"b": [1, 2]}}\n')
+            f.flush()
+            assert reader.read() == [{"kind": "report", "data": {"b": [1, 2]}}]
+            assert reader.read() == []
+
+    def test_skipped_report_round_trip(self, request, tmp_path):
+        """
+        A skip's (path, lineno, reason) longrepr is still a tuple once replayed, as the terminal reporter needs.
+        """
+        config = request.config
+        nodeid = "tests/test_a.py::test_skipped"
+        location = ("tests/test_a.py", 3, "test_skipped")
+        report = pytest.TestReport(nodeid, location, {}, "skipped",
+                                   ("tests/test_a.py", 4, "Skipped: no --filter-matrix"), "setup")
+        path = tmp_path / "reports.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            write_record(f, "report", config.hook.pytest_report_to_serializable(config=config, report=report))
+        [record] = RecordReader(str(path)).read()
+
+        replayed = []
+        hook = SimpleNamespace(
+            pytest_report_from_serializable=config.hook.pytest_report_from_serializable,
+            pytest_runtest_logstart=lambda nodeid, location: None,
+            pytest_runtest_logreport=lambda report: replayed.append(report),
+            pytest_runtest_logfinish=lambda nodeid, location: None,
+        )
+        progress = {}
+        replay_report(SimpleNamespace(hook=hook), {nodeid: SimpleNamespace(location=location)}, progress,
+                      record["data"])
+        [replayed_report] = replayed
+        assert replayed_report.skipped
+        assert replayed_report.longrepr == ("tests/test_a.py", 4, "Skipped: no --filter-matrix")
+        assert _get_raw_skip_reason(replayed_report) == "no --filter-matrix"
+        assert progress == {nodeid: "setup"}
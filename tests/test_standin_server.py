@@ -0,0 +1,86 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.customers import CUSTOMERS
+from utils.ordering import check_ordering
+from utils.standin_server import DEFECTS, StandInServer, TransactionsStore, parse_defects
+from utils.timestamps import is_strict_timestamp
+from utils.validation import validate_transactions
+
+
+def transactions(store, customer_key, **params):
+    status, body = store.respond(tuple(sorted({"customerId": CUSTOMERS[customer_key], **params}.items())))
+    assert status == 200
+    return json.loads(body)
+
+
+def positive_debits(rows):
+    return [tx for tx in rows if tx["type"] == "Debit" and tx["amount"] > 0]
+
+
+class TestParseDefects:
+    @pytest.mark.parametrize("value", [None, "", "none"])
+    def test_none(self, value):
+        assert parse_defects(value) == set()
+
+    def test_all(self):
+        assert parse_defects("all") == set(DEFECTS)
+
+    def test_list(self):
+        assert parse_defects(" missing_currency, positive_debits ,") == {"missing_currency", "positive_debits"}
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="slow_responses"):
+            parse_defects("missing_currency,slow_responses")
+
+
+class TestDefects:
+    def test_no_defects(self):
+        store = TransactionsStore.sample()
+        for key in ("Customer2", "Customer3", "Customer4", "Customer5"):
+            rows = transactions(store, key)
+            assert validate_transactions(rows) == {}
+            assert check_ordering(rows) == []
+            assert not positive_debits(rows)
+
+    def test_missing_currency(self):
+        store = TransactionsStore.sample({"missing_currency"})
+        assert all("currency" not in tx for tx in transactions(store, "Customer5"))
+        assert all("currency" in tx for tx in transactions(store, "Customer2"))
+
+    def test_unordered_dates(self):
+        store = TransactionsStore.sample({"unordered_dates"})
+        assert check_ordering(transactions(store, "Customer3"))
+        assert check_ordering(transactions(store, "Customer5")) == []
+
+    def test_bad_timestamp_format(self):
+        store = TransactionsStore.sample({"bad_timestamp_format"})
+        assert not any(is_strict_timestamp(tx["timestamp"]) for tx in transactions(store, "Customer5"))
+        assert all(is_strict_timestamp(tx["timestamp"]) for tx in transactions(store, "Customer3"))
+
+    def test_positive_debits(self):
+        store = TransactionsStore.sample({"positive_debits"})
+        assert positive_debits(transactions(store, "Customer5"))
+        assert not positive_debits(transactions(store, "Customer2"))
+
+    def test_defects_do_not_change_the_canned_data(self):
+        TransactionsStore.sample(set(DEFECTS))
+        assert validate_transactions(transactions(TransactionsStore.sample(), "Customer5")) == {}
+
+
+class TestStandInServer:
+    def test_serves_over_http(self):
+        server = StandInServer(TransactionsStore.sample()).start()
+        try:
+            with urllib.request.urlopen(f"{server.url}?customerId={CUSTOMERS['Customer2']}&categoryId=11") as r:
+                assert r.headers["content-type"] == "application/json"
+                assert [tx["transactionId"] for tx in json.load(r)] == ["c2-0001", "c2-0004"]
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{server.url}?customerId=not-a-guid")
+            assert error.value.code == 400
+            assert json.load(error.value) == "Invalid customerId guid format"
+        finally:
+            server.stop()
@@ -0,0 +1,141 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from utils.timestamps import LENIENT_FORMATS, is_strict_timestamp, parse_datetime, parse_timestamp
+
+UTC = timezone.utc
+
+
+class TestStrictTimestamps:
+    @pytest.mark.parametrize("value, expected", [
+        ("2025-06-05T08:15:00Z", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05t08:15:00z", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T08:15:00+00:00", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T08:15:00-00:00", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T09:15:00+01:00", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T02:45:00-05:30", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T08:15:00.5Z", datetime(2025, 6, 5, 8, 15, 0, 500000, tzinfo=UTC)),
+        ("2025-06-05T08:15:00.123Z", datetime(2025, 6, 5, 8, 15, 0, 123000, tzinfo=UTC)),
+        ("2025-06-05T08:15:00.123456Z", datetime(2025, 6, 5, 8, 15, 0, 123456, tzinfo=UTC)),
+        ("2025-06-05T08:15:00.123456789+02:00", datetime(2025, 6, 5, 6, 15, 0, 123456, tzinfo=UTC)),
+        ("2024-02-29T23:59:59Z", datetime(2024, 2, 29, 23, 59, 59, tzinfo=UTC)),
+    ])
+    def test_parses(self, value, expected):
+        parsed = parse_timestamp(value)
+        assert parsed.strict
+        assert parsed.moment == expected
+        assert parsed.epoch == expected.timestamp()
+        assert parse_datetime(value) == expected
+        assert is_strict_timestamp(value)
+
+    @pytest.mark.parametrize("value, offset", [
+        ("2025-06-05T08:15:00Z", 0.0),
+        ("2025-06-05T08:15:00+01:00", 3600.0),
+        ("2025-06-05T08:15:00-05:30", -19800.0),
+    ])
+    def test_offset(self, value, offset):
+        assert parse_timestamp(value).offset == offset
+
+    def test_date_is_in_the_timestamps_own_offset(self):
+        assert parse_timestamp("2025-06-05T23:30:00-02:00").date() == date(2025, 6, 5)
+        assert parse_timestamp("2025-06-06T00:30:00+02:00").date() == date(2025, 6, 6)
+
+    @pytest.mark.parametrize("value", [
+        "2025-06-05T08:15:00",             # no offset
+        "2025-06-05 08:15:00Z",            # space separator
+        "2025-06-05T08:15:00,5Z",          # comma fraction
+        "2025-06-05T08:15:00.Z",           # empty fraction
+        "2025-06-05T08:15:00+0100",        # offset without colon
+        "2025-06-05T08:15:00+01",
+        "2025-06-05T08:15:00+01:00:30",
+        "2025-06-05T08:15:00zZ",
+        "2025-06-05T08:15Z",               # no seconds
+        "2025-W23-4T08:15:00Z",            # week date
+    ])
+    def test_other_iso_forms_are_not_strict(self, value):
+        assert not is_strict_timestamp(value)
+
+    @pytest.mark.parametrize("value", [
+        "2025-13-05T08:15:00Z",
+        "2025-02-29T08:15:00Z",
+        "2025-06-05T24:00:00Z",
+        "2025-06-05T08:60:00Z",
+        "２025-06-05T08:15:00Z",
+        "",
+        "today",
+    ])
+    def test_rejects(self, value):
+        assert not is_strict_timestamp(value)
+        with pytest.raises(ValueError):
+            parse_timestamp(value)
+        with pytest.raises(ValueError):
+            parse_datetime(value)
+
+    @pytest.mark.parametrize("value", [None, 1749111300, b"2025-06-05T08:15:00Z"])
+    def test_rejects_non_strings(self, value):
+        assert not is_strict_timestamp(value)
+        with pytest.raises(ValueError):
+            parse_timestamp(value)
+        with pytest.raises(ValueError):
+            parse_datetime(value)
+
+
+class TestLenientTimestamps:
+    @pytest.mark.parametrize("fmt", LENIENT_FORMATS)
+    def test_every_lenient_format(self, fmt):
+        moment = datetime(2025, 6, 5, 8, 15, 30, tzinfo=UTC)
+        value = moment.strftime(fmt)
+        parsed = parse_timestamp(value)
+        assert not parsed.strict
+        assert parsed.moment.tzinfo is not None
+        # Formats without a time or an offset read as midnight / UTC
+        expected = datetime.strptime(value, fmt)
+        if expected.tzinfo is None:
+            expected = expected.replace(tzinfo=UTC)
+        assert parsed.moment == expected
+        assert parse_datetime(value) == expected
+
+    def test_iso_without_offset_is_utc(self):
+        parsed = parse_timestamp("2025-06-05T08:15:00")
+        assert not parsed.strict
+        assert parsed.moment == datetime(2025, 6, 5, 8, 15, tzinfo=UTC)
+        assert parsed.offset == 0.0
+
+    @pytest.mark.parametrize("value, expected", [
+        ("2025-06-05T09:15:00+0100", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T02:45:00-0530", datetime(2025, 6, 5, 8, 15, tzinfo=UTC)),
+        ("2025-06-05T09:15:00.250+0100", datetime(2025, 6, 5, 8, 15, 0, 250000, tzinfo=UTC)),
+    ])
+    def test_offset_without_colon(self, value, expected):
+        """
+        Read by LENIENT_FORMATS on every supported Python, not only by 3.11's fromisoformat.
+        """
+        parsed = parse_timestamp(value)
+        assert not parsed.strict
+        assert parsed.moment == expected
+        assert any(self._strptime(value, fmt) == expected for fmt in LENIENT_FORMATS)
+
+    @staticmethod
+    def _strptime(value, fmt):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            return None
+
+    def test_slashes(self):
+        assert parse_timestamp("2025/06/05 08:15:00").moment == datetime(2025, 6, 5, 8, 15, tzinfo=UTC)
+
+
+class TestNoCache:
+    def test_repeated_values_parse_alike(self):
+        assert parse_timestamp("2025-06-05T08:15:00Z") == parse_timestamp("2025-06-05T08:15:00Z")
+
+    def test_many_distinct_values(self):
+        """
+        More distinct timestamps than the former 65536-entry cache held all parse to their own instant.
+        """
+        start = datetime(2025, 6, 5, tzinfo=UTC)
+        for i in range(70_000):
+            moment = start - timedelta(seconds=i)
+            assert parse_datetime(moment.strftime("%Y-%m-%dT%H:%M:%SZ")) == moment
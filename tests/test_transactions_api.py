@@ -1,56 +1,17 @@
 from http.client import responses
 
 import pytest
-import requests
-from datetime import datetime
-from jsonschema import validate, ValidationError
-from dotenv import load_dotenv
-import os
+from datetime import date
 from utils import custom_logger as cl
+from utils import transactions_api as api
+from utils.customers import CUSTOMERS
+from utils.filter_matrix import MATRIX_CUSTOMERS
+from utils.ordering import check_ordering
+from utils.timestamps import parse_timestamp
+from utils.validation import format_violations, validate_transactions
+from utils.workload import QUERY_SHAPES
 
-# Loads BASE_URL and Headers stored as env variables
-load_dotenv()
-
-log = cl.customLogger()
-# Test configuration
-BASE_URL = os.getenv("BASE_URL")
-HEADERS = {
-    "host": os.getenv("host")
-}
-
-# Test customer IDs for different scenarios
-CUSTOMERS = {
-    "Customer1": "b3c8f5d2-4a6e-4c0b-9f7d-8f1c2e3a4b5c",  # Customer with no transactions
-    "Customer2": "746c51bc-bdb9-44d2-9a3e-c4715bc91ee4",  # Will return upto 5 transactions with expected behaviour
-    "Customer3": "5723a60b-b7f5-4259-b670-43bd3be1cf90",  # Will return upto 5 transactions with unexpected behaviours
-    "Customer4": "13ef28a8-9488-4d19-ba2f-3ff44912c5e8",  # Will return upto 5 transactions with unexpected behaviours
-    "Customer5": "0828a547-f4bf-433a-b3ef-0dc70d6bad8a",  # Will return upto 5 transactions with unexpected behaviours
-    "UnknownCustomer" : "4c67b4d3-f967-4706-84f3-9611d726fcbf" #Non-existing customer id
-}
-
-transaction_schema = {
-    "type": "object",
-    "required": [
-        "transactionId", "amount", "currency", "merchantName", "timestamp",
-        "type", "subType", "status", "categoryId", "description"
-    ],
-    "properties": {
-        "transactionId": {"type": "string"},
-        "amount": {"type": "number"},
-        "currency": {"type": "string"},
-        "merchantName": {"type": ["string", "null"]},
-        "timestamp": {
-            "type": "string",
-            "format": "date-time"
-        },
-        "type": {"type": "string", "enum": ["Debit", "Credit"]},
-        "subType": {"type": "string"},
-        "status": {"type": "string", "enum": ["Pending", "Booked"]},
-        "categoryId": {"type": "integer", "minimum": 1, "maximum": 20},
-        "description": {"type": "string"}
-    },
-    "additionalProperties": False
-}
+log = cl.customLogger(__name__)
 
 
 class TestTransactionsAPI:
@@ -58,44 +19,26 @@ class TestTransactionsAPI:
         """
         Helper method to make GET request with given customer ID and optional query params.
         """
-        params['customerId'] = customer_id
-        for key, value in params.items():
-            if isinstance(value, bool):
-                params[key] = str(value).lower()
-        return requests.get(BASE_URL, headers=HEADERS, params=params)
+        return api.fetch(api.build_params(customer_id, **params))
 
-    def validate_transaction_structure(self, transaction):
+    def validate_transactions_structure(self, transactions):
         """
-        Validates a single transaction object against the predefined JSON Schema.
+        Validates every transaction of a response against the predefined JSON Schema in one pass,
+        reporting all violations grouped by transaction index and field.
         """
-        try:
-            validate(instance=transaction, schema=transaction_schema)
-        except ValidationError as e:
-            log.error(f"Schema validation failed: {e.message}")
-            pytest.fail(f"Schema validation error: {e.message}")
+        violations = validate_transactions(transactions)
+        if violations:
+            summary = format_violations(violations)
+            log.error(f"Schema validation failed for {len(violations)} transaction(s):\n{summary}")
+            pytest.fail(f"Schema validation errors:\n{summary}")
 
     def validate_transaction_ordering(self, transactions):
         """
         Validates that transactions are ordered with all 'Pending' first, and each group sorted by timestamp descending.
         """
         try:
-            if len(transactions) <= 1:
-                return
-
-            # Split transactions into Pending and Booked groups
-            pending = [t for t in transactions if t['status'] == 'Pending']
-            booked = [t for t in transactions if t['status'] == 'Booked']
-
-            # Pending transactions must appear before any Booked ones
-            for i in range(len(pending)):
-                assert transactions[i]['status'] == 'Pending'
-
-            # Within each group, timestamps must be in descending order
-            for group in [pending, booked]:
-                for i in range(len(group) - 1):
-                    t1 = datetime.fromisoformat(group[i]['timestamp'].replace('Z', '+00:00'))
-                    t2 = datetime.fromisoformat(group[i + 1]['timestamp'].replace('Z', '+00:00'))
-                    assert t1 >= t2
+            violations = check_ordering(transactions)
+            assert not violations, "Ordering violations:\n" + "\n".join(str(v) for v in violations)
         except AssertionError as e:
             log.error(f"❌ Assertion failed {e}")
             raise
@@ -116,6 +59,7 @@ class TestTransactionsAPI:
             log.error(f"❌ Assertion failed {e}")
             raise
 
+    @pytest.mark.latency_slo(p95=150, repetitions=20)
     def test_get_all_transactions_normal_customer(self):
         """
         Validate correct structure, count and ordering of transactions for a normal customer.
@@ -128,8 +72,7 @@ class TestTransactionsAPI:
             assert isinstance(data, list)
             assert len(data) <= 5
 
-            for tx in data:
-                self.validate_transaction_structure(tx)
+            self.validate_transactions_structure(data)
             self.validate_transaction_ordering(data)
             log.info("✅ Test passed: test_get_all_transactions_normal_customer")
         except AssertionError as e:
@@ -155,7 +98,7 @@ class TestTransactionsAPI:
         Validate that missing customer ID results in a 400 response.
         """
         try:
-            response = requests.get(BASE_URL, headers=HEADERS)
+            response = api.get(api.build_params())
             assert response.status_code == 400
             assert response.text == '"Missing customerId query parameter"'
             assert response.headers.get('content-type') == 'application/json'
@@ -180,55 +123,67 @@ class TestTransactionsAPI:
 
 
 
-    def test_filter_by_category(self):
+    def test_filter_by_category(self, filter_oracle):
         """
         Validate that transactions can be filtered by categoryId correctly.
         """
         try:
-            response = self.make_request(CUSTOMERS["Customer2"], categoryId=11)
+            query = QUERY_SHAPES["category"]
+            response = self.make_request(CUSTOMERS["Customer2"], **query)
             assert response.status_code == 200
             data = response.json()
 
             for tx in data:
-                assert tx['categoryId'] == 11
-                log.info("✅ Test passed: test_filter_by_category")
+                assert tx['categoryId'] == query["categoryId"]
+            diff = filter_oracle(CUSTOMERS["Customer2"]).diff(query, data)
+            assert not diff, f"Filtered transactions differ from the unfiltered list: {diff}"
+            log.info("✅ Test passed: test_filter_by_category")
         except AssertionError as e:
             log.error(f"❌ Assertion failed {e}")
             raise
 
-    def test_filter_exclude_pending(self):
+    def test_filter_exclude_pending(self, filter_oracle):
         """
         Validate that includePending=False filters out all 'Pending' transactions.
         """
         try:
-            response = self.make_request(CUSTOMERS["Customer2"], includePending=False)
+            query = QUERY_SHAPES["exclude_pending"]
+            response = self.make_request(CUSTOMERS["Customer2"], **query)
             assert response.status_code == 200
             data = response.json()
 
             for tx in data:
                 assert tx['status'] != 'Pending'
-                log.info("✅ Test passed: test_filter_exclude_pending")
+            diff = filter_oracle(CUSTOMERS["Customer2"]).diff(query, data)
+            assert not diff, f"Filtered transactions differ from the unfiltered list: {diff}"
+            log.info("✅ Test passed: test_filter_exclude_pending")
         except AssertionError as e:
             log.error(f"❌ Assertion failed {e}")
             raise
 
-    def test_filter_by_date_range(self):
+    def test_filter_by_date_range(self, filter_oracle):
         """
         Validate date range filtering using fromDate and toDate parameters.
         """
         try:
-            response = self.make_request(CUSTOMERS["Customer2"], fromDate="2025-06-04", toDate="2025-06-05")
+            query = QUERY_SHAPES["date_range"]
+            response = self.make_request(CUSTOMERS["Customer2"], **query)
             assert response.status_code == 200
             data = response.json()
 
+            from_date = date.fromisoformat(query["fromDate"])
+            to_date = date.fromisoformat(query["toDate"])
             for tx in data:
-                tx_date = datetime.fromisoformat(tx['timestamp'].replace('Z', '+00:00')).date()
-                assert datetime(2025, 6, 4).date() <= tx_date <= datetime(2025, 6, 5).date()
-                log.info("✅ Test passed: test_filter_by_date_range")
+                tx_date = parse_timestamp(tx['timestamp']).date()
+                assert from_date <= tx_date <= to_date
+            diff = filter_oracle(CUSTOMERS["Customer2"]).diff(query, data)
+            assert not diff, f"Filtered transactions differ from the unfiltered list: {diff}"
+            log.info("✅ Test passed: test_filter_by_date_range")
         except AssertionError as e:
             log.error(f"❌ Assertion failed {e}")
             raise
 
+    @pytest.mark.prefetch(CUSTOMERS)
     @pytest.mark.parametrize("customer_key", ["Customer2", "Customer3", "Customer4", "Customer5"])
     def test_transaction_structure_consistency(self, customer_key):
         """
@@ -237,15 +192,15 @@ class TestTransactionsAPI:
         try:
             response = self.make_request(CUSTOMERS[customer_key])
             assert response.status_code == 200
-            data = response.json()
+            data = api.transactions(response)
 
-            for tx in data:
-                self.validate_transaction_structure(tx)
+            self.validate_transactions_structure(data)
             log.info(f"✅ Test passed: test_transaction_structure_consistency for {customer_key}")
         except AssertionError as e:
             log.error(f"❌ Assertion failed for {customer_key} due to {e}")
             raise
 
+    @pytest.mark.prefetch(CUSTOMERS)
     @pytest.mark.parametrize("customer_key", ["Customer2", "Customer3", "Customer4", "Customer5"])
     def test_transaction_ordering_consistency(self, customer_key):
         """
@@ -254,7 +209,7 @@ class TestTransactionsAPI:
         try:
             response = self.make_request(CUSTOMERS[customer_key])
             assert response.status_code == 200
-            data = response.json()
+            data = api.transactions(response)
 
             self.validate_transaction_ordering(data)
             log.info(f"✅ Test passed: test_transaction_ordering_consistency for {customer_key}")
@@ -262,6 +217,7 @@ class TestTransactionsAPI:
             log.error(f"❌ Assertion failed for {customer_key} due to {e}")
             raise
 
+    @pytest.mark.prefetch(CUSTOMERS)
     @pytest.mark.parametrize("customer_key", ["Customer2", "Customer3", "Customer4", "Customer5"])
     def test_amount_sign_consistency(self, customer_key):
         """
@@ -270,7 +226,7 @@ class TestTransactionsAPI:
         try:
             response = self.make_request(CUSTOMERS[customer_key])
             assert response.status_code == 200
-            data = response.json()
+            data = api.transactions(response)
 
             for tx in data:
                 if tx['type'] == 'Debit':
@@ -283,6 +239,7 @@ class TestTransactionsAPI:
             raise
 
 
+    @pytest.mark.prefetch(CUSTOMERS, QUERY_SHAPES["include_pending"], QUERY_SHAPES["exclude_pending"])
     @pytest.mark.parametrize("customer_key", ["Customer2", "Customer3", "Customer4", "Customer5"])
     def test_filter_behavior_consistency(self, customer_key):
         """
@@ -290,8 +247,8 @@ class TestTransactionsAPI:
         and includePending=False filters out 'Pending' ones.
         """
         try:
-            r1 = self.make_request(CUSTOMERS[customer_key], includePending=True)
-            r2 = self.make_request(CUSTOMERS[customer_key], includePending=False)
+            r1 = self.make_request(CUSTOMERS[customer_key], **QUERY_SHAPES["include_pending"])
+            r2 = self.make_request(CUSTOMERS[customer_key], **QUERY_SHAPES["exclude_pending"])
 
             assert r1.status_code == 200
             assert r2.status_code == 200
@@ -307,3 +264,33 @@ class TestTransactionsAPI:
         except AssertionError as e:
             log.error(f"❌ Assertion failed for {customer_key} due to {e}")
             raise
+
+    @pytest.mark.parametrize("customer_key", MATRIX_CUSTOMERS)
+    def test_filter_matrix(self, customer_key, filter_matrix_sweep):
+        """
+        Sweep every categoryId, includePending and date window combination concurrently and check each
+        filtered response against the customer's unfiltered transactions (runs with --filter-matrix).
+        """
+        try:
+            result = filter_matrix_sweep(CUSTOMERS[customer_key])
+            assert not result.failures, f"Filter matrix failures:\n{result.summary()}"
+            log.info(f"✅ Test passed: test_filter_matrix for {customer_key} "
+                     f"({result.queries} queries in {result.elapsed:.2f}s)")
+        except AssertionError as e:
+            log.error(f"❌ Assertion failed for {customer_key} due to {e}")
+            raise
+
+    def test_query_fuzz(self, query_fuzzer):
+        """
+        Fuzz the query parameters (malformed GUIDs, boundary and inverted dates, out-of-range categoryId, odd
+        booleans) and validate that every response is a well-formed 200, 400 or 404; failing queries are
+        reported with a minimal reproducer.
+        """
+        try:
+            result = query_fuzzer()
+            assert not result.failures, f"Fuzzed queries failed (reproduce with --fuzz-seed={result.seed}):\n" \
+                                        f"{result.summary()}"
+            log.info(f"✅ Test passed: test_query_fuzz ({result.summary()})")
+        except AssertionError as e:
+            log.error(f"❌ Assertion failed {e}")
+            raise
@@ -0,0 +1,57 @@
+from tests.test_fast_validator import VALID_TRANSACTION, mutated_transactions
+from utils.validation import format_violations, is_valid_transaction, transaction_validator, validate_transactions
+
+
+class TestValidateTransactions:
+    def test_valid_response(self):
+        assert validate_transactions([VALID_TRANSACTION] * 3) == {}
+        assert validate_transactions([]) == {}
+
+    def test_violations_of_a_malformed_item(self):
+        missing_currency = {k: v for k, v in VALID_TRANSACTION.items() if k != "currency"}
+        malformed = dict(missing_currency, amount="12.50", timestamp="2025/06/05 08:15:00", unexpected=1)
+        violations = validate_transactions([VALID_TRANSACTION, malformed, VALID_TRANSACTION])
+        assert list(violations) == [1]
+        fields = violations[1]
+        assert sorted(fields) == ["amount", "currency", "timestamp", "unexpected"]
+        assert all(len(messages) == 1 for messages in fields.values())
+        assert "'currency' is a required property" in fields["currency"][0]
+        assert "is not of type 'number'" in fields["amount"][0]
+        assert "is not a 'date-time'" in fields["timestamp"][0]
+
+    def test_items_that_are_not_objects(self):
+        violations = validate_transactions([None, VALID_TRANSACTION, "tx"])
+        assert sorted(violations) == [0, 2]
+        assert list(violations[0]) == ["<transaction>"]
+
+    def test_accepts_any_iterable(self):
+        assert list(validate_transactions(iter([VALID_TRANSACTION, {}]))) == [1]
+
+    def test_agrees_with_the_compiled_and_generic_validators(self):
+        transactions = list(mutated_transactions(seed=2, combined=500))
+        violations = validate_transactions(transactions)
+        for index, transaction in enumerate(transactions):
+            assert (index in violations) == (not is_valid_transaction(transaction))
+            if index in violations:
+                messages = sorted(message for messages in violations[index].values() for message in messages)
+                assert messages == sorted(error.message for error in transaction_validator.iter_errors(transaction))
+
+
+class TestFormatViolations:
+    def test_one_line_per_transaction_and_field(self):
+        violations = {3: {"amount": ["a", "b"], "currency": ["c"]}, 7: {"<transaction>": ["d"]}}
+        assert format_violations(violations) == "[3] amount: a; b\n[3] currency: c\n[7] <transaction>: d"
+
+    def test_empty(self):
+        assert format_violations({}) == ""
+
+    def test_truncated_after_limit(self):
+        violations = {index: {"amount": ["bad"]} for index in range(25)}
+        lines = format_violations(violations, limit=20).split("\n")
+        assert len(lines) == 21
+        assert lines[19] == "[19] amount: bad"
+        assert lines[-1] == "... 5 more"
+
+    def test_not_truncated_at_limit(self):
+        violations = {index: {"amount": ["bad"]} for index in range(20)}
+        assert "more" not in format_violations(violations, limit=20)
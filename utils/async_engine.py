@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from collections import defaultdict, deque
+
+
+async def _gather(func, calls, concurrency, rate):
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    interval = 1 / rate if rate else 0
+    next_start = loop.time()
+
+    async def run(args):
+        nonlocal next_start
+        async with semaphore:
+            if interval:
+                # Every call reserves the next start slot; the event loop is single-threaded so no lock is needed
+                start = max(next_start, loop.time())
+                next_start = start + interval
+                await asyncio.sleep(start - loop.time())
+            return await asyncio.to_thread(func, *args)
+
+    return await asyncio.gather(*(run(args) for args in calls), return_exceptions=True)
+
+
+def run_concurrently(func, calls, concurrency=8, rate=None):
+    """
+    Runs func(*args) for every args tuple in calls with at most `concurrency` calls in flight and, when
+    `rate` is given, at most `rate` calls started per second.
+
+    func is a blocking callable and runs on the default executor, so the total latency is close to the
+    slowest call rather than the sum of all of them. Results are returned in the order of calls; a call
+    that raised returns its exception instead of a result.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    return asyncio.run(_gather(func, calls, max(concurrency, 1), rate))
+
+
+class PrefetchStore:
+    """
+    Responses fetched ahead of time, handed out once each to the request that matches their key.
+    """
+
+    def __init__(self):
+        self._responses = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def put(self, key, response):
+        with self._lock:
+            self._responses[key].append(response)
+
+    def take(self, key):
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                return None
+            response = queue.popleft()
+            if not queue:
+                del self._responses[key]
+            return response
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(queue) for queue in self._responses.values())
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODES = ("off", "record", "replay", "hybrid")
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised in replay mode when a request has no recorded response.
+    """
+
+
+def cassette_key(params):
+    """
+    Normalized query string used as the key of a recorded interaction.
+    """
+    return "&".join(f"{key}={value}" for key, value in sorted((k, str(v)) for k, v in params.items()))
+
+
+def build_response(entry, url=None):
+    """
+    Rebuilds a requests.Response from a recorded interaction.
+    """
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry.get("reason")
+    response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    response.encoding = entry.get("encoding") or "utf-8"
+    response._content = entry["body"].encode(response.encoding)
+    response._content_consumed = True
+    response.url = url
+    return response
+
+
+def response_entry(response, body=None):
+    """
+    JSON-serializable form of a response, the inverse of build_response. body is the decoded body when
+    the response's own has already been consumed, otherwise response.text is read.
+    """
+    return {
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": dict(response.headers),
+        "encoding": response.encoding,
+        "body": response.text if body is None else body,
+    }
+
+
+class Cassette:
+    """
+    On-disk store of recorded responses keyed by normalized query.
+
+    - record: every request goes to the network and its response is stored;
+    - replay: responses are served from disk only, a missing one raises CassetteMiss;
+    - hybrid: responses are served from disk and only cache misses go to the network (and are stored);
+    - off: the cassette is not used.
+    """
+
+    def __init__(self, path, mode="off"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.interactions = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        if mode in ("replay", "hybrid") and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.interactions = json.load(f)["interactions"]
+
+    @property
+    def plays(self):
+        return self.mode in ("replay", "hybrid")
+
+    @property
+    def records(self):
+        return self.mode in ("record", "hybrid")
+
+    def play(self, params, url=None):
+        """
+        Returns the recorded response for params, or None (raises CassetteMiss in replay mode).
+        """
+        entry = self.interactions.get(cassette_key(params))
+        if entry is not None:
+            return build_response(entry, url)
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recorded response for {cassette_key(params)} in {self.path}")
+        return None
+
+    def record(self, params, response):
+        """
+        Stores the response to params. The body of a streamed response (see PooledClient.get) is not read
+        here: it is copied as the caller iterates over it and stored once it has been read to the end, so
+        streamed parsing still starts on the first chunk. A streamed body that is not read to the end is
+        not recorded.
+        """
+        if getattr(response, "streamed", False):
+            self._record_when_read(params, response)
+        else:
+            self._store(params, response_entry(response))
+
+    def _record_when_read(self, params, response):
+        iter_content = response.iter_content
+
+        def tee(chunk_size=1, decode_unicode=False):
+            chunks = []
+            for chunk in iter_content(chunk_size, decode_unicode):
+                chunks.append(chunk)
+                yield chunk
+            if chunks and isinstance(chunks[0], str):
+                body = "".join(chunks)
+            else:
+                body = b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+            self._store(params, dict(response_entry(response, body), encoding=response.encoding or "utf-8"))
+
+        # Response.content reads through iter_content too, so .json() and .text are recorded as well
+        response.iter_content = tee
+
+    def _store(self, params, entry):
+        with self._lock:
+            self.interactions[cassette_key(params)] = entry
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "interactions": self.interactions}, f, indent=2, sort_keys=True)
+            self.dirty = False
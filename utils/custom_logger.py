@@ -1,14 +1,143 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler
 
+# Maximum number of records formatted and written per stream write
+BATCH_SIZE = 512
+# Logger the console handler is attached to; customLogger(name) returns its children
+BASE_LOGGER = "transactions"
 
-def customLogger():
 
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+class AsyncHandler(QueueHandler):
+    """
+    Handler that only puts records on a queue; formatting and I/O happen on the listener thread.
+    """
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+    def handle(self, record):
+        # The queue is thread-safe, so skip the handler lock that Handler.handle takes around emit()
+        if not self.filter(record):
+            return False
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+        return True
 
-    logger.addHandler(console_handler)
-    return logger
\ No newline at end of file
+    def prepare(self, record):
+        # Merge the arguments now since they may be mutated after the call returns, but leave the
+        # formatting (and any exception traceback) to the listener
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class BatchingListener:
+    """
+    Drains a queue of log records on a background thread and writes everything that is queued in one
+    write and one flush per batch, so a burst of log lines costs a single I/O round.
+    """
+
+    def __init__(self, stream, batch_size=BATCH_SIZE):
+        self.records = queue.SimpleQueue()
+        self.handler = logging.StreamHandler(stream)
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            self._write([record for record in batch if isinstance(record, logging.LogRecord)])
+            for marker in batch:
+                if isinstance(marker, threading.Event):
+                    marker.set()
+                elif marker is None:
+                    return
+
+    def _write(self, records):
+        if not records:
+            return
+        try:
+            text = "".join(self.handler.format(record) + self.handler.terminator for record in records)
+            self.handler.stream.write(text)
+            self.handler.flush()
+        except Exception:
+            self.handler.handleError(records[0])
+
+    def flush(self, timeout=5.0):
+        """
+        Blocks until every record queued so far is written.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        written = threading.Event()
+        self.records.put(written)
+        written.wait(timeout)
+
+    def stop(self):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.records.put(None)
+        self._thread.join()
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_listener():
+    """
+    Returns the process-wide listener writing to stdout, starting it on first use.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = BatchingListener(sys.stdout).start()
+            atexit.register(_listener.stop)
+        return _listener
+
+
+def flush():
+    if _listener is not None:
+        _listener.flush()
+
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+
+def customLogger(name=None):
+    """
+    Returns the logger `name` (e.g. the caller's __name__) as a child of the "transactions" logger, or the
+    "transactions" logger itself without a name.
+
+    The console handler is attached once, to the "transactions" logger only, and loggers are cached by
+    name, so calling the factory again, from any module or worker, never adds a handler. The root logger
+    is left alone; records still propagate to it, so pytest captures them for the report.
+    """
+    with _loggers_lock:
+        logger = _loggers.get(name)
+        if logger is not None:
+            return logger
+        base = logging.getLogger(BASE_LOGGER)
+        if not any(isinstance(handler, AsyncHandler) for handler in base.handlers):
+            base.setLevel(logging.INFO)
+            console_handler = AsyncHandler(get_listener().records)
+            console_handler.setLevel(logging.INFO)
+            base.addHandler(console_handler)
+        logger = base.getChild(name) if name else base
+        _loggers[name] = logger
+        return logger
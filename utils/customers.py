@@ -0,0 +1,9 @@
+# Test customer IDs for different scenarios
+CUSTOMERS = {
+    "Customer1": "b3c8f5d2-4a6e-4c0b-9f7d-8f1c2e3a4b5c",  # Customer with no transactions
+    "Customer2": "746c51bc-bdb9-44d2-9a3e-c4715bc91ee4",  # Will return upto 5 transactions with expected behaviour
+    "Customer3": "5723a60b-b7f5-4259-b670-43bd3be1cf90",  # Will return upto 5 transactions with unexpected behaviours
+    "Customer4": "13ef28a8-9488-4d19-ba2f-3ff44912c5e8",  # Will return upto 5 transactions with unexpected behaviours
+    "Customer5": "0828a547-f4bf-433a-b3ef-0dc70d6bad8a",  # Will return upto 5 transactions with unexpected behaviours
+    "UnknownCustomer" : "4c67b4d3-f967-4706-84f3-9611d726fcbf" #Non-existing customer id
+}
@@ -0,0 +1,209 @@
+"""
+Deterministic synthetic transaction datasets for scale testing.
+
+A SyntheticCustomer describes a customer with any number of transactions (10k to 10M and beyond) that
+match transaction_schema and the endpoint's ordering: Pending first, each group by timestamp descending.
+Rows are generated on demand from a seed, so a dataset is never held in memory and the same seed always
+gives the same rows. The stand-in server serves these customers (streamed, see utils.standin_server) and
+this module writes them to replay cassettes.
+
+Run from the repository root:
+    python -m utils.datasets --rows 10000,100000 --seed 1 --defects none --cassette cassettes/synthetic.json
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import accumulate
+
+from utils.cassette import Cassette, cassette_key
+
+# Relative frequency of each categoryId (1-20 in transaction_schema); groceries, transport and eating out
+# dominate like in a real current account
+CATEGORY_WEIGHTS = {
+    1: 2, 2: 3, 3: 6, 4: 14, 5: 3, 6: 3, 7: 4, 8: 2, 9: 3, 10: 2,
+    11: 16, 12: 4, 13: 5, 14: 3, 15: 2, 16: 4, 17: 2, 18: 3, 19: 2, 20: 2,
+}
+
+# (merchantName, description, subType) per transaction type
+DEBITS = (
+    ("Supermarket", "Groceries", "CardPayment"),
+    ("Coffee Shop", "Flat white", "CardPayment"),
+    ("Fuel Station", "Fuel", "CardPayment"),
+    ("Streaming Co", "Subscription", "DirectDebit"),
+    ("Gym", "Membership", "DirectDebit"),
+    (None, "Cash withdrawal", "Atm"),
+    ("Restaurant", "Dinner", "CardPayment"),
+    ("Marketplace", "Order", "CardPayment"),
+)
+CREDITS = (
+    ("Employer Ltd", "Salary", "BankTransfer"),
+    ("A Jones", "Dinner split", "BankTransfer"),
+    ("Marketplace", "Refund", "BankTransfer"),
+)
+
+# Known API defects, see "Brief Report" in the README
+DEFECTS = {
+    "missing_currency": "Currency is missing from Customer5's transactions",
+    "unordered_dates": "Customer3's booked transactions are not in descending date order",
+    "bad_timestamp_format": "Customer5's timestamps are not ISO 8601",
+    "positive_debits": "Some of Customer5's debit amounts are positive",
+}
+
+
+def parse_defects(value):
+    """
+    Parses a --defects value: "all", "none" or a comma-separated list of DEFECTS keys.
+    """
+    if value in (None, "", "none"):
+        return set()
+    if value == "all":
+        return set(DEFECTS)
+    defects = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = defects - set(DEFECTS)
+    if unknown:
+        raise ValueError(f"Unknown defects {sorted(unknown)}, expected any of {sorted(DEFECTS)}")
+    return defects
+
+
+class SyntheticCustomer:
+    """
+    A customer whose transactions are generated on demand; iterating it again yields the same rows.
+
+    - rows: number of transactions;
+    - pending_ratio: share of Pending transactions, listed first;
+    - category_weights: {categoryId: weight} used to draw each transaction's category;
+    - credit_ratio: share of Credit transactions;
+    - span_days: time covered by the transactions, ending at `end`;
+    - defects / defect_rate: DEFECTS (by name) applied to that share of the rows. Defects are drawn from
+      their own random stream, so injecting them leaves the other rows as is.
+    """
+
+    def __init__(self, rows, seed=0, pending_ratio=0.05, category_weights=None, credit_ratio=0.15,
+                 span_days=365, end=datetime(2025, 6, 6, tzinfo=timezone.utc), defects=(), defect_rate=0.01):
+        unknown = set(defects) - set(DEFECTS)
+        if unknown:
+            raise ValueError(f"Unknown defects {sorted(unknown)}, expected any of {sorted(DEFECTS)}")
+        self.rows = rows
+        self.seed = seed
+        self.pending_ratio = pending_ratio
+        self.category_weights = category_weights or CATEGORY_WEIGHTS
+        self.credit_ratio = credit_ratio
+        self.span_days = span_days
+        self.end = end
+        self.defects = tuple(defects)
+        self.defect_rate = defect_rate
+        self.customer_id = str(uuid.UUID(int=random.Random(f"customer-{seed}-{rows}").getrandbits(128), version=4))
+
+    def __len__(self):
+        return self.rows
+
+    def __repr__(self):
+        return f"SyntheticCustomer({self.customer_id}, rows={self.rows}, seed={self.seed})"
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        defect_rng = random.Random(f"defects-{self.seed}")
+        categories = list(self.category_weights)
+        cum_weights = list(accumulate(self.category_weights.values()))
+        pending = round(self.rows * self.pending_ratio)
+        mean_gap = self.span_days * 86400 / max(self.rows, 1)
+        clock = self.end.timestamp()
+        prefix = self.customer_id[:8]
+
+        for index in range(self.rows):
+            clock -= rng.expovariate(1 / mean_gap) if mean_gap else 0
+            is_credit = rng.random() < self.credit_ratio
+            merchant, description, sub_type = rng.choice(CREDITS if is_credit else DEBITS)
+            amount = round(min(rng.lognormvariate(3, 1.2), 5000) + 0.01, 2)
+            tx = {
+                "transactionId": f"{prefix}-{index:08d}",
+                "amount": amount if is_credit else -amount,
+                "currency": "GBP",
+                "merchantName": merchant,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(clock)),
+                "type": "Credit" if is_credit else "Debit",
+                "subType": sub_type,
+                "status": "Pending" if index < pending else "Booked",
+                "categoryId": rng.choices(categories, cum_weights=cum_weights)[0],
+                "description": description,
+            }
+            if self.defects and defect_rng.random() < self.defect_rate:
+                self._inject(tx, clock, defect_rng)
+            yield tx
+
+    def _inject(self, tx, clock, rng):
+        defect = rng.choice(self.defects)
+        if defect == "missing_currency":
+            del tx["currency"]
+        elif defect == "unordered_dates":
+            # Newer than the transaction listed before it
+            tx["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(clock + 86400))
+        elif defect == "bad_timestamp_format":
+            tx["timestamp"] = time.strftime("%Y/%m/%d %H:%M:%S", time.gmtime(clock))
+        elif defect == "positive_debits" and tx["type"] == "Debit":
+            tx["amount"] = -tx["amount"]
+
+
+def record_cassette(cassette, customers, queries=({},)):
+    """
+    Stores the response of every query for every customer in a cassette, filtered by the stand-in
+    server's rules so the cassette answers exactly like the stand-in would.
+    """
+    from utils.standin_server import TransactionsStore
+    from utils.transactions_api import build_params
+
+    store = TransactionsStore({customer.customer_id: customer for customer in customers})
+    for customer in customers:
+        for query in queries:
+            params = build_params(customer.customer_id, **query)
+            status, body = store.respond(tuple(sorted((key, str(value)) for key, value in params.items())))
+            body = body if isinstance(body, bytes) else b"".join(body)
+            cassette.interactions[cassette_key(params)] = {
+                "status": status, "reason": "OK" if status == 200 else None,
+                "headers": {"content-type": "application/json", "content-length": str(len(body))},
+                "encoding": "utf-8", "body": body.decode(),
+            }
+            cassette.dirty = True
+
+
+def parse_rows(value):
+    """
+    Parses "10000,100k,1M" into [10000, 100000, 1000000].
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    rows = []
+    for part in value.lower().split(","):
+        part = part.strip()
+        rows.append(int(float(part[:-1]) * multipliers[part[-1]]) if part[-1] in multipliers else int(part))
+    return rows
+
+
+def main(argv=None):
+    from utils.workload import QUERY_SHAPES
+
+    parser = argparse.ArgumentParser(description="Generate synthetic transaction datasets")
+    parser.add_argument("--rows", default="10000", help="Comma-separated dataset sizes, e.g. 10k,100k,1M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pending-ratio", type=float, default=0.05)
+    parser.add_argument("--defects", default="none",
+                        help=f"all, none or a comma-separated list of: {', '.join(DEFECTS)}")
+    parser.add_argument("--defect-rate", type=float, default=0.01)
+    parser.add_argument("--cassette", help="Record every query shape of every dataset into this cassette")
+    args = parser.parse_args(argv)
+
+    defects = sorted(parse_defects(args.defects))
+    customers = [SyntheticCustomer(rows, seed=args.seed, pending_ratio=args.pending_ratio, defects=defects,
+                                   defect_rate=args.defect_rate) for rows in parse_rows(args.rows)]
+    for customer in customers:
+        print(f"{customer.customer_id}: {customer.rows} transactions")
+    if args.cassette:
+        cassette = Cassette(args.cassette, "hybrid")
+        record_cassette(cassette, customers, list(QUERY_SHAPES.values()))
+        cassette.save()
+        print(f"Recorded {len(customers) * len(QUERY_SHAPES)} responses in {args.cassette}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import threading
+
+# Weight of the newest run in a test's smoothed duration
+SMOOTHING = 0.5
+
+
+def fill_unknown(nodeids, durations):
+    """
+    Returns {nodeid: seconds} for nodeids; tests without a recorded duration count as the median recorded
+    one (1s when there is no history).
+    """
+    known = sorted(durations[nodeid] for nodeid in nodeids if nodeid in durations)
+    default = known[len(known) // 2] if known else 1.0
+    return {nodeid: durations.get(nodeid, default) for nodeid in nodeids}
+
+
+def longest_first(nodeids, durations):
+    """
+    Orders nodeids slowest first, keeping collection order among tests with the same duration.
+    """
+    estimates = fill_unknown(nodeids, durations)
+    order = {nodeid: index for index, nodeid in enumerate(nodeids)}
+    return sorted(nodeids, key=lambda nodeid: (-estimates[nodeid], order[nodeid]))
+
+
+class DurationStore:
+    """
+    JSON file of the wall-clock time of every test ID (including parametrized IDs) across runs.
+
+    Each test keeps its last duration, the number of runs and an exponentially smoothed duration that is
+    used as its estimate, so one slow run shifts the schedule without dominating it. Tests that no longer
+    exist stay in the file; they cost a few bytes and are back in the schedule if they are re-enabled.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tests = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.tests = json.load(f)["tests"]
+            except (ValueError, KeyError):
+                # A corrupt history only costs the balancing of one run
+                self.tests = {}
+
+    def estimates(self):
+        """
+        {nodeid: smoothed seconds} of every recorded test.
+        """
+        return {nodeid: entry["smoothed"] for nodeid, entry in self.tests.items()}
+
+    def record(self, nodeid, seconds):
+        with self._lock:
+            entry = self.tests.get(nodeid)
+            if entry is None:
+                self.tests[nodeid] = {"last": seconds, "smoothed": seconds, "runs": 1}
+            else:
+                entry["last"] = seconds
+                entry["smoothed"] = SMOOTHING * seconds + (1 - SMOOTHING) * entry["smoothed"]
+                entry["runs"] += 1
+
+    def save(self):
+        """
+        Writes the store atomically, so concurrent runs never leave a truncated file behind.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".durations-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": 1, "tests": self.tests}, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
@@ -0,0 +1,101 @@
+import numbers
+
+SUPPORTED_KEYWORDS = {
+    "type", "required", "properties", "additionalProperties", "enum", "minimum", "maximum", "format",
+}
+
+TYPE_CHECKS = {
+    "string": "type({v}) is str",
+    "number": "(type({v}) is int or type({v}) is float or "
+              "(isinstance({v}, _Number) and not isinstance({v}, bool)))",
+    "integer": "((type({v}) is int) or (type({v}) is float and {v}.is_integer()) or "
+               "(isinstance({v}, int) and not isinstance({v}, bool)))",
+    "boolean": "type({v}) is bool",
+    "null": "{v} is None",
+    "array": "isinstance({v}, list)",
+    "object": "isinstance({v}, dict)",
+}
+
+
+def _unsupported(schema):
+    unsupported = set(schema) - SUPPORTED_KEYWORDS
+    if unsupported:
+        raise ValueError(f"Cannot compile schema keywords: {sorted(unsupported)}")
+
+
+def _value_checks(schema, v, constants, format_checks):
+    """
+    Returns the source lines that reject `v` when it does not match a leaf property schema.
+    """
+    _unsupported(schema)
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        raise ValueError("Nested object schemas are not supported")
+    lines = []
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        lines.append(f"if not ({' or '.join(TYPE_CHECKS[t].format(v=v) for t in types)}): return False")
+    if "enum" in schema:
+        if not all(isinstance(value, str) for value in schema["enum"]):
+            raise ValueError("Only string enums are supported")
+        name = f"_enum{len(constants)}"
+        constants[name] = frozenset(schema["enum"])
+        lines.append(f"if type({v}) is not str or {v} not in {name}: return False")
+    numeric = TYPE_CHECKS["number"].format(v=v)
+    if "minimum" in schema:
+        lines.append(f"if {numeric} and {v} < {schema['minimum']!r}: return False")
+    if "maximum" in schema:
+        lines.append(f"if {numeric} and {v} > {schema['maximum']!r}: return False")
+    if "format" in schema:
+        name = f"_format{len(format_checks)}"
+        format_checks[name] = schema["format"]
+        lines.append(f"if not {name}({v}): return False")
+    return lines
+
+
+def compile_schema(schema, format_checker=None):
+    """
+    Compiles a flat object schema into a specialized function returning True when an instance is valid.
+
+    The generated code does direct key, type, enum and range checks instead of walking the schema, and
+    accepts exactly what jsonschema accepts for the supported keywords. It only answers valid/invalid;
+    use the generic validator to explain why an instance is invalid. Raises ValueError for schemas that
+    use keywords it cannot compile.
+    """
+    _unsupported(schema)
+    if schema.get("type") != "object":
+        raise ValueError("Only object schemas are supported")
+
+    constants = {}
+    format_checks = {}
+    properties = schema.get("properties", {})
+    lines = ["def is_valid(instance):",
+             "    if not isinstance(instance, dict): return False"]
+    for key in schema.get("required", []):
+        lines.append(f"    if {key!r} not in instance: return False")
+    if schema.get("additionalProperties", True) is False:
+        constants["_allowed"] = frozenset(properties)
+        lines.append("    if not _allowed.issuperset(instance): return False")
+    elif schema.get("additionalProperties", True) is not True:
+        raise ValueError("Only boolean additionalProperties are supported")
+    for index, (key, subschema) in enumerate(properties.items()):
+        v = f"v{index}"
+        checks = _value_checks(subschema, v, constants, format_checks)
+        if not checks:
+            continue
+        lines.append(f"    if {key!r} in instance:")
+        lines.append(f"        {v} = instance[{key!r}]")
+        lines.extend(f"        {check}" for check in checks)
+    lines.append("    return True")
+    source = "\n".join(lines)
+
+    namespace = dict(constants, _Number=numbers.Number)
+    for name, fmt in format_checks.items():
+        if format_checker is None:
+            namespace[name] = lambda value: True
+        else:
+            namespace[name] = lambda value, fmt=fmt: format_checker.conforms(value, fmt)
+    exec(compile(source, "<compiled schema>", "exec"), namespace)
+    is_valid = namespace["is_valid"]
+    is_valid.source = source
+    return is_valid
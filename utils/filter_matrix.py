@@ -0,0 +1,146 @@
+"""
+Combinatorial sweep of the transactions endpoint's filters.
+
+For a customer, every categoryId of transaction_schema is combined with includePending true/false and a
+set of date windows around the customer's transactions (see date_windows), which gives several hundred
+queries. They are sent concurrently under a request rate limit and every response is checked against a
+FilterOracle built from the customer's unfiltered list.
+
+Run from the repository root:
+    python -m utils.filter_matrix [--standin] [--rps 200] [--concurrency 16] [Customer2 ...]
+"""
+import argparse
+import time
+from datetime import timedelta
+from itertools import product
+
+from utils import http_client
+from utils import transactions_api as api
+from utils.async_engine import run_concurrently
+from utils.customers import CUSTOMERS
+from utils.filter_oracle import FilterOracle
+from utils.schema import transaction_schema
+
+_category_schema = transaction_schema["properties"]["categoryId"]
+CATEGORY_IDS = range(_category_schema["minimum"], _category_schema["maximum"] + 1)
+INCLUDE_PENDING = (True, False)
+
+# Customers with a transaction list to sweep (UnknownCustomer answers 404)
+MATRIX_CUSTOMERS = ("Customer1", "Customer2", "Customer3", "Customer4", "Customer5")
+
+
+def date_windows(oracle):
+    """
+    (fromDate, toDate) windows for a customer, None standing for a bound left out: no date filter, the
+    whole span, its first and last days, open-ended windows from or up to the middle, and windows just
+    before and after every transaction, which should come back empty.
+    """
+    windows = [(None, None)]
+    span = oracle.date_range()
+    if span is None:
+        return windows
+    first, last = span
+    middle = first + (last - first) / 2
+    windows += [
+        (first, last),
+        (first, first),
+        (last, last),
+        (middle, None),
+        (None, middle),
+        (first - timedelta(days=30), first - timedelta(days=1)),
+        (last + timedelta(days=1), last + timedelta(days=30)),
+    ]
+    return windows
+
+
+def matrix_queries(windows):
+    """
+    Query params (before build_params) of every categoryId × includePending × date window combination.
+    """
+    queries = []
+    for category_id, include_pending, (from_date, to_date) in product(CATEGORY_IDS, INCLUDE_PENDING, windows):
+        query = {"categoryId": category_id, "includePending": include_pending}
+        if from_date is not None:
+            query["fromDate"] = from_date.isoformat()
+        if to_date is not None:
+            query["toDate"] = to_date.isoformat()
+        queries.append(query)
+    return queries
+
+
+class SweepResult:
+    """
+    Outcome of sweeping one customer: the number of queries sent and a (query, problem) pair per failure.
+    """
+
+    def __init__(self, customer_id, queries, elapsed):
+        self.customer_id = customer_id
+        self.queries = queries
+        self.elapsed = elapsed
+        self.failures = []
+
+    def summary(self, limit=20):
+        lines = [f"{self.customer_id}: {self.queries} queries in {self.elapsed:.2f}s, {len(self.failures)} failed"]
+        lines.extend(f"  {query}: {problem}" for query, problem in self.failures[:limit])
+        if len(self.failures) > limit:
+            lines.append(f"  ... {len(self.failures) - limit} more")
+        return "\n".join(lines)
+
+
+def sweep(customer_id, oracle=None, concurrency=16, rate=200):
+    """
+    Sends the filter matrix of a customer concurrently, at most `rate` requests per second, and checks each
+    response against `oracle` (built from the unfiltered response when not given). Requests go over the
+    wire (api.send) so hundreds of filtered responses do not fill the response cache.
+    """
+    if oracle is None:
+        response = api.send(api.build_params(customer_id))
+        response.raise_for_status()
+        oracle = FilterOracle(response.json())
+    queries = matrix_queries(date_windows(oracle))
+    start = time.perf_counter()
+    responses = run_concurrently(api.send, [(api.build_params(customer_id, **query),) for query in queries],
+                                 concurrency, rate)
+    result = SweepResult(customer_id, len(queries), time.perf_counter() - start)
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            result.failures.append((query, f"{type(response).__name__}: {response}"))
+        elif response.status_code != 200:
+            result.failures.append((query, f"status {response.status_code}"))
+        else:
+            diff = oracle.diff(query, response.json())
+            if diff:
+                result.failures.append((query, str(diff)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep every filter combination of the transactions API")
+    parser.add_argument("customers", nargs="*", default=MATRIX_CUSTOMERS, help="Keys of utils.customers.CUSTOMERS")
+    parser.add_argument("--rps", type=float, default=200, help="Maximum requests started per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    parser.add_argument("--standin", action="store_true",
+                        help="Sweep a local stand-in server (no defects) instead of BASE_URL")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.standin:
+        from utils.standin_server import StandInServer, TransactionsStore
+
+        server = StandInServer(TransactionsStore.sample()).start()
+        api.BASE_URL = server.url
+    failed = 0
+    try:
+        for key in args.customers:
+            result = sweep(CUSTOMERS[key], concurrency=args.concurrency, rate=args.rps)
+            print(result.summary())
+            failed += len(result.failures)
+    finally:
+        http_client.close_client()
+        if server is not None:
+            server.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+
+from utils.timestamps import parse_timestamp
+
+
+class FilterDiff:
+    """
+    Difference between the transactions a filtered query should return and the ones it returned.
+    """
+
+    def __init__(self, missing, unexpected, misordered):
+        self.missing = missing
+        self.unexpected = unexpected
+        self.misordered = misordered
+
+    def __bool__(self):
+        return bool(self.missing or self.unexpected or self.misordered)
+
+    def __str__(self):
+        parts = []
+        if self.missing:
+            parts.append(f"missing {len(self.missing)}: {', '.join(map(str, self.missing[:10]))}")
+        if self.unexpected:
+            parts.append(f"unexpected {len(self.unexpected)}: {', '.join(map(str, self.unexpected[:10]))}")
+        if self.misordered:
+            parts.append("returned in a different order than the unfiltered list")
+        return "; ".join(parts) or "no difference"
+
+
+def filters_for(params):
+    """
+    Reads categoryId, includePending, fromDate and toDate from query params, raw (QUERY_SHAPES) or built
+    (api.build_params), as the (category_id, include_pending, from_date, to_date) arguments of
+    FilterOracle.positions. Raises ValueError when a categoryId or date does not parse.
+    """
+    category_id = params.get("categoryId")
+    include_pending = params.get("includePending", True)
+    if isinstance(include_pending, str):
+        include_pending = include_pending.lower() == "true"
+    from_date, to_date = params.get("fromDate"), params.get("toDate")
+    return (None if category_id is None else int(category_id), include_pending,
+            None if from_date is None else date.fromisoformat(str(from_date)),
+            None if to_date is None else date.fromisoformat(str(to_date)))
+
+
+class FilterOracle:
+    """
+    Answers any categoryId/includePending/fromDate/toDate combination from a customer's unfiltered
+    transactions, with the endpoint's rules (categoryId equality, Pending excluded when includePending is
+    false, inclusive calendar-date range on the timestamp).
+
+    The indexes are built once: positions per categoryId, a bitmap of Pending positions and the positions
+    sorted by date. A query starts from the narrowest of the category list and the date range (found by
+    binary search), so it costs O(log n) plus the size of that candidate set, and returns the matching
+    transactions in their unfiltered order.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.by_category = defaultdict(list)
+        # Status bitmap, one byte per position: 1 for Pending
+        self.pending = bytearray(len(self.transactions))
+        # Calendar date (ordinal) of each position, None when the timestamp cannot be parsed
+        self._ordinals = []
+        for position, tx in enumerate(self.transactions):
+            self.by_category[tx.get("categoryId")].append(position)
+            if tx.get("status") == "Pending":
+                self.pending[position] = 1
+            try:
+                self._ordinals.append(parse_timestamp(tx.get("timestamp")).date().toordinal())
+            except (TypeError, ValueError):
+                self._ordinals.append(None)
+        dated = sorted((ordinal, position) for position, ordinal in enumerate(self._ordinals) if ordinal is not None)
+        self._dates = [ordinal for ordinal, _ in dated]
+        self._by_date = [position for _, position in dated]
+
+    def date_range(self):
+        """
+        (first, last) calendar date of the transactions with a parseable timestamp, or None when there are none.
+        """
+        if not self._dates:
+            return None
+        return date.fromordinal(self._dates[0]), date.fromordinal(self._dates[-1])
+
+    def positions(self, category_id=None, include_pending=True, from_date=None, to_date=None):
+        """
+        Positions in the unfiltered list of the transactions matching the filters, in order.
+        """
+        if from_date is None and to_date is None:
+            candidates = range(len(self.transactions)) if category_id is None else self.by_category.get(category_id, [])
+        else:
+            first = -1 if from_date is None else from_date.toordinal()
+            last = float("inf") if to_date is None else to_date.toordinal()
+            low, high = bisect_left(self._dates, first), bisect_right(self._dates, last)
+            by_category = None if category_id is None else self.by_category.get(category_id, [])
+            if by_category is not None and len(by_category) < high - low:
+                candidates = [position for position in by_category
+                              if self._ordinals[position] is not None and first <= self._ordinals[position] <= last]
+            else:
+                candidates = sorted(self._by_date[low:high])
+                if category_id is not None:
+                    candidates = [position for position in candidates
+                                  if self.transactions[position].get("categoryId") == category_id]
+        if not include_pending:
+            pending = self.pending
+            candidates = [position for position in candidates if not pending[position]]
+        return list(candidates)
+
+    def expected(self, params):
+        """
+        The transactions the endpoint should return for the query params.
+        """
+        return [self.transactions[position] for position in self.positions(*filters_for(params))]
+
+    def diff(self, params, actual):
+        """
+        Compares a filtered response's transactions with the expected ones by transactionId.
+        """
+        expected_ids = [tx.get("transactionId") for tx in self.expected(params)]
+        actual_ids = [tx.get("transactionId") for tx in actual]
+        expected_set, actual_set = set(expected_ids), set(actual_ids)
+        missing = [tid for tid in expected_ids if tid not in actual_set]
+        unexpected = [tid for tid in actual_ids if tid not in expected_set]
+        misordered = not missing and not unexpected and actual_ids != expected_ids
+        return FilterDiff(missing, unexpected, misordered)
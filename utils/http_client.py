@@ -0,0 +1,232 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family, create_connection
+
+PHASES = ("dns", "connect", "tls", "ttfb", "body")
+
+# Connection-phase timings of the request currently being sent on this thread
+_phase_timings = threading.local()
+
+
+def _current_phases():
+    phases = getattr(_phase_timings, "phases", None)
+    if phases is None:
+        phases = _phase_timings.phases = dict.fromkeys(PHASES, 0.0)
+    return phases
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """
+    HTTPConnection that times DNS resolution and the TCP connect separately.
+    """
+
+    def _new_conn(self):
+        phases = _current_phases()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host.strip("[]"), self.port, allowed_gai_family(),
+                                           socket.SOCK_STREAM)
+        except OSError:
+            addresses = None
+        resolved_at = time.perf_counter()
+        phases["dns"] += resolved_at - start
+        try:
+            if not addresses:
+                # Let urllib3 resolve again and raise its own NameResolutionError
+                return super()._new_conn()
+            return self._connect_first(addresses)
+        finally:
+            phases["connect"] += time.perf_counter() - resolved_at
+
+    def _connect_first(self, addresses):
+        """
+        Connects to the first of the resolved addresses that accepts, in getaddrinfo order like urllib3 does,
+        and raises urllib3's errors when none does.
+        """
+        error = None
+        for *_, sockaddr in addresses:
+            try:
+                sock = create_connection(sockaddr[:2], self.timeout, source_address=self.source_address,
+                                         socket_options=self.socket_options)
+            except OSError as e:
+                error = e
+                continue
+            sys.audit("http.client.connect", self, self.host, self.port)
+            return sock
+        if isinstance(error, socket.timeout):
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})") from error
+        raise NewConnectionError(self, f"Failed to establish a new connection: {error}") from error
+
+
+class TimedHTTPSConnection(HTTPSConnection, TimedHTTPConnection):
+    """
+    HTTPSConnection that additionally times the TLS handshake.
+    """
+
+    def connect(self):
+        phases = _current_phases()
+        before = phases["dns"] + phases["connect"]
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            phases["tls"] += time.perf_counter() - start - (phases["dns"] + phases["connect"] - before)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections record per-phase timings.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class PooledClient:
+    """
+    Keep-alive HTTP client backed by a single requests.Session and urllib3 connection pools.
+
+    pool_connections is the number of per-host pools kept alive, pool_maxsize the number of
+    connections kept per host and pool_block caps a host at pool_maxsize concurrent connections.
+
+    Every response carries a `timings` dict splitting the request into DNS resolution, TCP connect,
+    TLS handshake, time to first byte (request sent to response headers) and body download, in seconds.
+    DNS, connect and TLS are 0 when a kept-alive connection was reused. Its `streamed` flag is True when
+    get(stream=True) left the body unread.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, pool_block=False, keep_alive=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        self.adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize,
+                                   pool_block=pool_block)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self._final_stats = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a client from the HTTP_* variables (see .env.sample).
+        """
+        return cls(pool_connections=_env_int("HTTP_POOL_CONNECTIONS", 4),
+                   pool_maxsize=_env_int("HTTP_POOL_MAXSIZE", 10),
+                   pool_block=_env_bool("HTTP_POOL_BLOCK", False),
+                   keep_alive=_env_bool("HTTP_KEEP_ALIVE", True))
+
+    def get(self, url, **kwargs):
+        stream = kwargs.pop("stream", False)
+        phases = _phase_timings.phases = dict.fromkeys(PHASES, 0.0)
+        start = time.perf_counter()
+        response = self.session.get(url, stream=True, **kwargs)
+        headers_at = time.perf_counter()
+        phases["ttfb"] = headers_at - start - phases["dns"] - phases["connect"] - phases["tls"]
+        if not stream:
+            response.content
+            phases["body"] = time.perf_counter() - headers_at
+        response.timings = phases
+        response.streamed = stream
+        _phase_timings.phases = None
+        return response
+
+    def connection_stats(self):
+        """
+        Returns {host: {"requests", "connections", "reused"}} for every pool the client opened.
+        """
+        if self._final_stats is not None:
+            return self._final_stats
+        pools = self.adapter.poolmanager.pools
+        stats = {}
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+            entry["reused"] += max(pool.num_requests - pool.num_connections, 0)
+        return stats
+
+    def close(self):
+        self._final_stats = self.connection_stats()
+        self.session.close()
+
+
+_client = None
+
+
+def get_client():
+    """
+    Returns the process-wide pooled client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        _client = PooledClient.from_env()
+    return _client
+
+
+def configure_client(**kwargs):
+    """
+    Replaces the process-wide client with one built from kwargs (see PooledClient), e.g. to size the
+    pool for a load run.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = PooledClient(**kwargs)
+    return _client
+
+
+def close_client():
+    """
+    Closes the process-wide client and returns its final connection stats.
+    """
+    global _client
+    if _client is None:
+        return {}
+    _client.close()
+    stats = _client.connection_stats()
+    _client = None
+    return stats
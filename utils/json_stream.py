@@ -0,0 +1,100 @@
+import codecs
+import json
+import re
+
+# Bytes read from the socket per chunk when streaming a response body
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+# Characters that can follow an array item; a number or literal is only complete once one of them arrived
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_array(chunks):
+    """
+    Yields the items of a top-level JSON array as soon as each one has arrived.
+
+    chunks is an iterable of bytes (UTF-8) or str, e.g. response.iter_content(). Only the item being
+    decoded is kept in memory, so memory stays flat whatever the size of the array. Raises ValueError
+    when the document is not an array, is truncated or has anything but whitespace after the array.
+    """
+    chunks = iter(chunks)
+    # The C scanner behind json.loads, without raw_decode's wrapper
+    scan_once = json.JSONDecoder().scan_once
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos = "", 0
+    started = closed = eof = False
+    expect_item = first = True
+
+    while True:
+        pos = _skip_whitespace(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if closed:
+                raise ValueError(f"Extra data after JSON array: {buffer[pos:pos + 20]!r}")
+            if not started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 20]!r}")
+                started = True
+                pos += 1
+                continue
+            if not expect_item:
+                if char == "]":
+                    closed = True
+                    pos += 1
+                    continue
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos:pos + 20]!r}")
+                expect_item = True
+                pos += 1
+                continue
+            if char == "]":
+                if not first:
+                    raise ValueError("Trailing comma in JSON array")
+                closed = True
+                pos += 1
+                continue
+            try:
+                item, end = scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                if eof:
+                    raise ValueError(f"Invalid JSON array item at {buffer[pos:pos + 20]!r}") from None
+                end = None
+            # "12" or "1." at the end of the buffer could still be the start of "123" or "1.5"
+            if end is not None and (buffer[end:end + 1] in _DELIMITERS if end < len(buffer) else eof):
+                yield item
+                pos = end
+                expect_item = first = False
+                continue
+            if eof:
+                raise ValueError(f"Invalid JSON array item at {buffer[pos:pos + 20]!r}")
+        elif eof:
+            if closed:
+                return
+            raise ValueError("Truncated JSON array" if started else "Expected a JSON array, got nothing")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            text, eof = text_decoder.decode(b"", final=True), True
+        else:
+            text = text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        buffer, pos = buffer[pos:] + text, 0
+
+
+def iter_json_array(items, chunk_size=CHUNK_SIZE):
+    """
+    Serializes an iterable as a JSON array in byte chunks of about chunk_size, the inverse of iter_array.
+    """
+    encode = json.JSONEncoder().encode
+    parts = ["["]
+    size = 1
+    for index, item in enumerate(items):
+        text = encode(item)
+        parts.append(text if index == 0 else ", " + text)
+        size += len(text) + 2
+        if size >= chunk_size:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    parts.append("]")
+    yield "".join(parts).encode()
@@ -0,0 +1,256 @@
+import math
+import threading
+
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds. Each power-of-two range is split into linear sub-buckets so every
+    recorded value is kept to `significant_digits` decimal digits of precision whatever its magnitude, and
+    only non-empty buckets are stored. Histograms with the same precision merge bucket by bucket, so
+    merging the histograms of parallel workers loses nothing.
+    """
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half = self._sub_bucket_count >> 1
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        bucket = max(value.bit_length() - self._sub_bucket_bits, 0)
+        return bucket * self._sub_bucket_half + (value >> bucket)
+
+    def _highest_equivalent(self, index):
+        if index < self._sub_bucket_count:
+            return index
+        bucket = index // self._sub_bucket_half - 1
+        sub_bucket = index - bucket * self._sub_bucket_half
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record(self, microseconds, count=1):
+        value = max(int(microseconds), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1_000_000)
+
+    def record_corrected(self, microseconds, expected_interval):
+        """
+        Records a value measured by a client that waits for each response before sending the next request,
+        back-filling the samples it never took while it was stalled (coordinated omission correction): a
+        request that took N expected intervals hid N - 1 requests that would have waited value - interval,
+        value - 2 * interval, ... had they been sent on schedule.
+        """
+        self.record(microseconds)
+        if expected_interval <= 0:
+            return
+        missing = microseconds - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        return self
+
+    def percentile(self, q):
+        """
+        Value in microseconds at or below which q percent of the recorded values fall.
+        """
+        if not self.total:
+            return 0
+        target = max(math.ceil(q / 100 * self.total), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0
+
+    def to_dict(self):
+        return {"significant_digits": self.significant_digits, "total": self.total, "sum": self.sum,
+                "min": self.min, "max": self.max, "counts": {str(index): count for index, count in self.counts.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["significant_digits"])
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.total = data["total"]
+        histogram.sum = data.get("sum", 0)
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+def variant_of(params):
+    """
+    Query-shape variant of a request, e.g. "plain", "categoryId" or "fromDate+toDate".
+    """
+    keys = sorted(key for key in params if key != "customerId")
+    return "+".join(keys) if keys else "plain"
+
+
+class LatencyRecorder:
+    """
+    Thread-safe set of latency histograms keyed by variant.
+    """
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, variant, seconds, expected_interval=None):
+        """
+        Records a latency in seconds; with expected_interval (seconds) missing samples are back-filled,
+        see LatencyHistogram.record_corrected.
+        """
+        with self._lock:
+            histogram = self.histograms.get(variant)
+            if histogram is None:
+                histogram = self.histograms[variant] = LatencyHistogram(self.significant_digits)
+            if expected_interval is None:
+                histogram.record_seconds(seconds)
+            else:
+                histogram.record_corrected(seconds * 1_000_000, expected_interval * 1_000_000)
+
+    def merge(self, other):
+        with self._lock:
+            for variant, histogram in other.histograms.items():
+                self.histograms.setdefault(variant, LatencyHistogram(histogram.significant_digits)).merge(histogram)
+        return self
+
+    def combined(self):
+        combined = LatencyHistogram(self.significant_digits)
+        for histogram in self.histograms.values():
+            combined.merge(histogram)
+        return combined
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def to_dict(self):
+        return {variant: histogram.to_dict() for variant, histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        for variant, histogram in data.items():
+            recorder.histograms[variant] = LatencyHistogram.from_dict(histogram)
+        return recorder
+
+    def report_rows(self):
+        """
+        [(variant, count, p50, p90, p99, p99.9, max)] in milliseconds, followed by an "all" row.
+        """
+        rows = []
+        items = sorted(self.histograms.items())
+        if len(items) > 1:
+            items.append(("all", self.combined()))
+        for variant, histogram in items:
+            rows.append((variant, histogram.total,
+                         *(histogram.percentile(q) / 1000 for q in REPORT_PERCENTILES), histogram.max / 1000))
+        return rows
+
+    def report_lines(self):
+        rows = self.report_rows()
+        # Wide enough for the longest variant, e.g. "categoryId+fromDate+includePending+toDate"
+        width = max(24, *(len(variant) for variant, *_ in rows)) if rows else 24
+        lines = [f"{'variant':<{width}} {'count':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'max':>9}  (ms)"]
+        for variant, count, *values in rows:
+            lines.append(f"{variant:<{width}} {count:>7} " + " ".join(f"{value:>9.2f}" for value in values))
+        return lines
+
+
+class PhaseRecorder:
+    """
+    Thread-safe latency histograms per request phase (see utils.http_client.PHASES), keyed by group,
+    e.g. a test ID or a customer.
+    """
+
+    def __init__(self, phases, significant_digits=3):
+        self.phases = tuple(phases)
+        self.significant_digits = significant_digits
+        self.groups = {}
+        self._lock = threading.Lock()
+
+    def record(self, group, timings):
+        """
+        Records a {phase: seconds} dict; the sum of the phases is recorded as "total".
+        """
+        with self._lock:
+            histograms = self.groups.get(group)
+            if histograms is None:
+                histograms = self.groups[group] = {phase: LatencyHistogram(self.significant_digits)
+                                                   for phase in (*self.phases, "total")}
+            for phase in self.phases:
+                histograms[phase].record_seconds(timings.get(phase, 0))
+            histograms["total"].record_seconds(sum(timings.get(phase, 0) for phase in self.phases))
+
+    def merge(self, other):
+        with self._lock:
+            for group, histograms in other.groups.items():
+                mine = self.groups.setdefault(group, {})
+                for phase, histogram in histograms.items():
+                    mine.setdefault(phase, LatencyHistogram(histogram.significant_digits)).merge(histogram)
+        return self
+
+    def clear(self):
+        with self._lock:
+            self.groups.clear()
+
+    def to_dict(self):
+        return {group: {phase: histogram.to_dict() for phase, histogram in histograms.items()}
+                for group, histograms in self.groups.items()}
+
+    @classmethod
+    def from_dict(cls, phases, data):
+        recorder = cls(phases)
+        for group, histograms in data.items():
+            recorder.groups[group] = {phase: LatencyHistogram.from_dict(histogram)
+                                      for phase, histogram in histograms.items()}
+        return recorder
+
+    def report_rows(self):
+        """
+        [(group, count, mean of each phase..., mean total, p95 total)] in milliseconds, sorted by group.
+        """
+        rows = []
+        for group, histograms in sorted(self.groups.items()):
+            total = histograms["total"]
+            rows.append((group, total.total, *(histograms[phase].mean() / 1000 for phase in self.phases),
+                         total.mean() / 1000, total.percentile(95) / 1000))
+        return rows
+
+    def report_lines(self, label="group", width=40):
+        header = " ".join(f"{phase:>9}" for phase in (*self.phases, "total", "p95"))
+        lines = [f"{label:<{width}} {'count':>7} {header}  (mean ms, p95 of total)"]
+        for group, count, *values in self.report_rows():
+            lines.append(f"{group:<{width}} {count:>7} " + " ".join(f"{value:>9.2f}" for value in values))
+        return lines
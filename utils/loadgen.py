@@ -0,0 +1,190 @@
+"""
+Open-loop load generator for the transactions API.
+
+Sends the query shapes of TestTransactionsAPI (utils.workload) through the same request path as
+make_request at a fixed request rate for a set duration, independently of how fast responses come back.
+Give several rates to step up the load and find the throughput ceiling.
+
+Latency is reported twice. Response time is measured from each request's intended send time, so time a
+request spent waiting behind a stalled service or a busy client counts against the service and the
+percentiles are free of coordinated omission. Service time is measured from the moment the request
+actually went out, which is what a naive client reports. With --closed-loop, a fixed number of users
+each wait for their response before sending the next request, and the samples they failed to take
+while stalled are back-filled into the response-time histogram.
+
+Run from the repository root:
+    python -m utils.loadgen --rps 50,100,200 --duration 30 [--mix plain=4,category=1] [--standin]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import http_client
+from utils import transactions_api as api
+from utils.latency import LatencyRecorder
+from utils.workload import QUERY_SHAPES, Workload, parse_mix
+
+
+class LoadResult:
+    """
+    Outcome of one load stage.
+    """
+
+    def __init__(self, target_rps, duration):
+        self.target_rps = target_rps
+        self.duration = duration
+        self.scheduled = 0
+        self.statuses = Counter()
+        self.errors = Counter()
+        # Measured from the intended send time (coordinated-omission corrected)
+        self.latencies = LatencyRecorder()
+        # Measured from the actual send time
+        self.service_times = LatencyRecorder()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, shape, status, intended, sent, finished, error=None, expected_interval=None):
+        with self._lock:
+            if error is not None:
+                self.errors[type(error).__name__] += 1
+            else:
+                self.statuses[status] += 1
+        self.service_times.record(shape, finished - sent)
+        self.latencies.record(shape, finished - intended, expected_interval)
+
+    @property
+    def completed(self):
+        return sum(self.statuses.values())
+
+    @property
+    def achieved_rps(self):
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        lines = [f"target {self.target_rps:.1f} rps | achieved {self.achieved_rps:.1f} rps | "
+                 f"sent {self.scheduled} ok {self.completed} errors {sum(self.errors.values())} | "
+                 f"statuses {dict(self.statuses)}"]
+        lines.append("  response time (from intended send time, coordinated-omission corrected)")
+        lines.extend(f"    {line}" for line in self.latencies.report_lines())
+        lines.append("  service time (from actual send time, uncorrected)")
+        lines.extend(f"    {line}" for line in self.service_times.report_lines())
+        return "\n".join(lines)
+
+
+def _send(result, shape, params, intended, expected_interval=None):
+    sent = time.perf_counter()
+    try:
+        response = api.send(params)
+    except Exception as e:
+        result.record(shape, None, intended, sent, time.perf_counter(), e, expected_interval)
+    else:
+        result.record(shape, response.status_code, intended, sent, time.perf_counter(),
+                      expected_interval=expected_interval)
+
+
+def run_stage(workload, rps, duration, workers=64):
+    """
+    Sends rps * duration requests, each at its scheduled time start + i / rps, without waiting for
+    earlier responses (open loop). Requests run on a pool of `workers` threads.
+    """
+    result = LoadResult(rps, duration)
+    total = int(rps * duration)
+    interval = 1.0 / rps
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        for i in range(total):
+            intended = start + i * interval
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            shape, params = workload.next_query()
+            pool.submit(_send, result, shape, params, intended)
+            result.scheduled += 1
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def run_closed_loop_stage(workload, rps, duration, users=8):
+    """
+    Runs `users` threads that each send a request, wait for its response and then wait for their next
+    slot (users / rps seconds after the previous send). A slow response makes a user miss slots instead
+    of catching up, like a classic closed-loop client; the missed samples are back-filled so the
+    response-time percentiles stay honest.
+    """
+    result = LoadResult(rps, duration)
+    interval = users / rps
+    lock = threading.Lock()
+
+    def user():
+        deadline = start + duration
+        intended = time.perf_counter()
+        while intended < deadline:
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                shape, params = workload.next_query()
+                result.scheduled += 1
+            _send(result, shape, params, intended, expected_interval=interval)
+            intended = max(intended + interval, time.perf_counter())
+
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the transactions API")
+    parser.add_argument("--rps", default="50",
+                        help="Target request rate, or a comma-separated list of rates run one after another")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate")
+    parser.add_argument("--mix", default=",".join(QUERY_SHAPES),
+                        help="Weighted query shapes, e.g. plain=4,category=1,date_range=1")
+    parser.add_argument("--workers", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--closed-loop", action="store_true",
+                        help="Use --workers users that each wait for their response before sending again")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--standin", action="store_true",
+                        help="Target a local stand-in server (no defects) instead of BASE_URL")
+    parser.add_argument("--synthetic", default="",
+                        help="With --standin, load synthetic customers of these sizes (e.g. 10k,100k) instead "
+                             "of the test customers, to see how latency scales with response size")
+    args = parser.parse_args(argv)
+    if args.synthetic and not args.standin:
+        parser.error("--synthetic needs --standin")
+
+    server = None
+    workload_kwargs = {}
+    if args.standin:
+        from utils.datasets import SyntheticCustomer, parse_rows
+        from utils.standin_server import StandInServer, TransactionsStore
+        synthetic = [SyntheticCustomer(rows) for rows in (parse_rows(args.synthetic) if args.synthetic else [])]
+        server = StandInServer(TransactionsStore.sample(synthetic=synthetic)).start()
+        api.BASE_URL = server.url
+        if synthetic:
+            directory = {f"synthetic-{customer.rows}": customer.customer_id for customer in synthetic}
+            workload_kwargs = {"customers": list(directory), "directory": directory}
+    http_client.configure_client(pool_maxsize=args.workers, pool_block=True)
+
+    workload = Workload(parse_mix(args.mix), seed=args.seed, **workload_kwargs)
+    try:
+        for rps in (float(value) for value in args.rps.split(",")):
+            if args.closed_loop:
+                print(run_closed_loop_stage(workload, rps, args.duration, args.workers).summary())
+            else:
+                print(run_stage(workload, rps, args.duration, args.workers).summary())
+    finally:
+        http_client.close_client()
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
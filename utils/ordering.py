@@ -0,0 +1,59 @@
+from typing import NamedTuple
+
+from utils.timestamps import parse_datetime
+
+
+class OrderingViolation(NamedTuple):
+    index: int
+    transaction_id: object
+    message: str
+
+    def __str__(self):
+        return f"[{self.index}] {self.transaction_id}: {self.message}"
+
+
+def check_ordering(transactions, max_violations=10):
+    """
+    Checks in a single pass that all 'Pending' transactions come before the others and that the
+    'Pending' and 'Booked' groups are each sorted by timestamp descending.
+
+    Timestamps go through the shared parser (leniently, so the malformed variants some
+    customers return can still be ordered) and nothing is copied, so any iterable (including a stream of
+    transactions) is checked in linear time and constant memory. Returns the first `max_violations`
+    violations with their positions; an empty list means the ordering is correct.
+    """
+    violations = []
+    first_settled = None
+    # status -> timestamp and index of the previous transaction of that status
+    previous = {'Pending': None, 'Booked': None}
+    previous_index = {}
+    parse = parse_datetime
+    for index, transaction in enumerate(transactions):
+        status = transaction.get('status')
+        if status == 'Pending':
+            if first_settled is not None:
+                violations.append(OrderingViolation(
+                    index, transaction.get('transactionId'),
+                    f"Pending transaction after non-Pending one at index {first_settled}"))
+        elif first_settled is None:
+            first_settled = index
+
+        if status in previous:
+            raw = transaction.get('timestamp')
+            try:
+                timestamp = parse(raw)
+            except ValueError:
+                violations.append(OrderingViolation(
+                    index, transaction.get('transactionId'), f"Unparseable timestamp {raw!r}"))
+            else:
+                last = previous[status]
+                if last is not None and timestamp > last:
+                    violations.append(OrderingViolation(
+                        index, transaction.get('transactionId'),
+                        f"{status} timestamp {raw} is newer than the one at index {previous_index[status]}"))
+                previous[status] = timestamp
+                previous_index[status] = index
+
+        if violations and len(violations) >= max_violations:
+            return violations[:max_violations]
+    return violations
@@ -0,0 +1,305 @@
+"""
+Property-based fuzzing of the transactions endpoint's query parameters.
+
+QueryFuzzer draws queries from the whole make_request parameter space: known, unknown and malformed
+customer GUIDs, categoryId in and out of range or not a number, odd spellings of includePending, and
+boundary, invalid and inverted fromDate/toDate pairs. Whatever the query, the endpoint must answer with a
+well-formed body (see check): a JSON array of transactions for 200, or a JSON error message for 400 and 404.
+When a 200 answers a query whose filters are unambiguous, it must also match the FilterOracle of the
+customer's unfiltered list.
+
+Cases are sent concurrently under a requests-per-second cap until a wall-clock budget runs out, and never
+more than budget × rps of them. Each failing case is then shrunk to a minimal reproducer by dropping
+parameters and simplifying values for as long as the query keeps failing. Shrinking is paced at the same
+rate and shares one budget of shrink_steps requests across all failures, so a run costs at most
+budget × rps + shrink_steps requests. The same seed always draws the same queries.
+
+Run from the repository root:
+    python -m utils.query_fuzz [--standin] [--budget 5] [--rps 100] [--seed 1]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+from utils import http_client
+from utils import transactions_api as api
+from utils.async_engine import run_concurrently
+from utils.customers import CUSTOMERS
+from utils.filter_oracle import FilterOracle, filters_for
+
+STATUSES = (200, 400, 404)
+# Cases sent per run_concurrently call; the budget is checked between batches
+BATCH_SIZE = 32
+
+_BOOLEANS = ("true", "false", "True", "FALSE", "tRuE", "1", "0", "yes", "no", "t", "", " true", "true ", "null")
+_CATEGORY_IDS = ("1", "20", "0", "21", "-1", "999", "2147483648", "99999999999999999999", "1.5", "1e1", "abc",
+                 "", " 5", "0x10", "٣")
+_DATES = ("2025-06-05", "2025-06-01", "2024-02-29", "0001-01-01", "9999-12-31", "1970-01-01", "2025-02-29",
+          "2025-13-01", "2025-06-32", "2025-6-5", "20250605", "2025-06-05T00:00:00", "2025-06-05Z", "05/06/2025",
+          "", "today")
+
+
+def _malformed_guid(rng, guid):
+    """
+    A string that looks more or less like a GUID but is not a valid one, or is a different spelling of one.
+    """
+    variants = (
+        guid[:-1],
+        guid + "0",
+        guid.replace("-", ""),
+        guid.upper(),
+        "{" + guid + "}",
+        guid[:8] + "-" + guid[9:],
+        guid.replace(guid[rng.randrange(len(guid))], "g", 1),
+        " " + guid,
+        guid + "\n",
+        "00000000-0000-0000-0000-000000000000",
+        "",
+        "null",
+        "x" * rng.choice((1, 36, 200, 4096)),
+        "é" * 36,
+    )
+    return rng.choice(variants)
+
+
+class QueryFuzzer:
+    """
+    Draws random queries (raw string params, sent as is) over the parameter space of make_request.
+    """
+
+    def __init__(self, seed=None, customers=CUSTOMERS):
+        self.seed = seed
+        self.customers = list(customers.values())
+        self._random = random.Random(seed)
+
+    def _date(self):
+        rng = self._random
+        if rng.random() < 0.5:
+            return rng.choice(_DATES)
+        # A valid date around the transactions, to reach the filtering code
+        return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    def case(self):
+        rng = self._random
+        params = {}
+        pick = rng.random()
+        if pick < 0.6:
+            params["customerId"] = rng.choice(self.customers)
+        elif pick < 0.7:
+            params["customerId"] = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        elif pick < 0.95:
+            params["customerId"] = _malformed_guid(rng, rng.choice(self.customers))
+        if rng.random() < 0.5:
+            params["categoryId"] = rng.choice(_CATEGORY_IDS) if rng.random() < 0.5 else str(rng.randint(-5, 25))
+        if rng.random() < 0.5:
+            params["includePending"] = rng.choice(_BOOLEANS)
+        if rng.random() < 0.5:
+            params["fromDate"] = self._date()
+        if rng.random() < 0.5:
+            params["toDate"] = self._date()
+        if "fromDate" in params and "toDate" in params and rng.random() < 0.3:
+            # Inverted range
+            params["fromDate"], params["toDate"] = sorted((params["fromDate"], params["toDate"]), reverse=True)
+        return params
+
+
+def _oracle_filters(params):
+    """
+    The filters of a query when their meaning is unambiguous, otherwise None.
+    """
+    include_pending = params.get("includePending")
+    if include_pending is not None and include_pending.lower() not in ("true", "false"):
+        return None
+    try:
+        return filters_for(params)
+    except ValueError:
+        return None
+
+
+def check(params, response, oracle_for=None):
+    """
+    Returns what is wrong with the response to a fuzzed query, or None when it is well-formed.
+
+    oracle_for(customer_id) returns the customer's FilterOracle, or None when there is none to compare with.
+    """
+    if isinstance(response, Exception):
+        return f"{type(response).__name__}: {response}"
+    status = response.status_code
+    if status not in STATUSES:
+        return f"status {status}, expected one of {STATUSES}"
+    if response.headers.get("content-type") != "application/json":
+        return f"status {status} with content-type {response.headers.get('content-type')!r}"
+    try:
+        body = response.json()
+    except ValueError:
+        return f"status {status} with a body that is not JSON: {response.text[:80]!r}"
+    if status != 200:
+        if not isinstance(body, str) or not body:
+            return f"status {status} without an error message: {response.text[:80]!r}"
+        return None
+    if not isinstance(body, list) or not all(isinstance(tx, dict) for tx in body):
+        return f"status 200 with a body that is not a list of transactions: {response.text[:80]!r}"
+    oracle = oracle_for(params.get("customerId")) if oracle_for is not None else None
+    if oracle is not None and _oracle_filters(params) is not None:
+        diff = oracle.diff(params, body)
+        if diff:
+            return f"status 200 with transactions that do not match the filters: {diff}"
+    return None
+
+
+def problem_kind(problem):
+    """
+    The part of a problem that names the kind of failure, without the details of the response.
+    """
+    return problem.partition(":")[0]
+
+
+def simplifications(params):
+    """
+    Simpler variants of a query, simplest first: without one parameter, then with one value shortened.
+    """
+    for key in params:
+        yield {k: v for k, v in params.items() if k != key}
+    for key, value in params.items():
+        for simpler in dict.fromkeys((value[:len(value) // 2], value[1:], value[:-1])):
+            if simpler != value:
+                yield {**params, key: simpler}
+
+
+def shrink(params, fails, max_steps=100):
+    """
+    Shrinks a failing query to a minimal one that still fails(params), greedily trying simplifications()
+    and restarting from each one that fails. Stops after max_steps tries; returns (params, tries).
+    """
+    tries = 0
+    progress = True
+    while progress and tries < max_steps:
+        progress = False
+        for candidate in simplifications(params):
+            tries += 1
+            if fails(candidate):
+                params, progress = candidate, True
+                break
+            if tries >= max_steps:
+                break
+    return params, tries
+
+
+class FuzzResult:
+    """
+    Outcome of a fuzzing run: the number of cases sent and a (query, problem, minimal query) per kind of
+    failure found.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.cases = 0
+        self.elapsed = 0.0
+        self.failures = []
+        self.shrink_requests = 0
+
+    def summary(self, limit=10):
+        lines = [f"seed {self.seed}: {self.cases} cases in {self.elapsed:.2f}s "
+                 f"({self.cases / self.elapsed if self.elapsed else 0:.0f}/s), {len(self.failures)} failed"]
+        if self.shrink_requests:
+            lines[0] += f", {self.shrink_requests} requests to shrink them"
+        for params, problem, minimal in self.failures[:limit]:
+            lines.append(f"  {json.dumps(params)}: {problem}")
+            lines.append(f"    minimal reproducer: {json.dumps(minimal)}")
+        if len(self.failures) > limit:
+            lines.append(f"  ... {len(self.failures) - limit} more")
+        return "\n".join(lines)
+
+
+def fuzz(budget=5.0, rate=100, concurrency=8, seed=None, oracle_for=None, max_failures=5, shrink_steps=100):
+    """
+    Sends fuzzed queries over the wire until `budget` seconds have passed, at most `rate` per second and
+    budget × rate in all, and checks every response. The first failing query of each kind of problem (up to
+    max_failures kinds) is shrunk once the budget is spent to a minimal query failing the same way. Shrinking
+    is sequential, paced at `rate`, and sends at most shrink_steps requests for all the failures together.
+    """
+    fuzzer = QueryFuzzer(seed)
+    result = FuzzResult(seed)
+    failing = {}
+    start = time.perf_counter()
+    limit = max(1, int(rate * budget))
+    while time.perf_counter() - start < budget and result.cases < limit:
+        cases = [fuzzer.case() for _ in range(min(BATCH_SIZE, limit - result.cases))]
+        responses = run_concurrently(api.send, [(params,) for params in cases], concurrency, rate)
+        result.cases += len(cases)
+        for params, response in zip(cases, responses):
+            problem = check(params, response, oracle_for)
+            if problem is not None and len(failing) < max_failures:
+                failing.setdefault(problem_kind(problem), (params, problem))
+    result.elapsed = time.perf_counter() - start
+
+    interval = 1 / rate if rate else 0
+    next_start = time.perf_counter()
+    for kind, (params, problem) in failing.items():
+        def fails(candidate):
+            nonlocal next_start
+            delay = next_start - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_start = max(next_start, time.perf_counter()) + interval
+            try:
+                response = api.send(candidate)
+            except Exception as e:
+                response = e
+            problem = check(candidate, response, oracle_for)
+            return problem is not None and problem_kind(problem) == kind
+
+        minimal, tries = shrink(params, fails, shrink_steps - result.shrink_requests)
+        result.shrink_requests += tries
+        result.failures.append((params, problem, minimal))
+    return result
+
+
+def customer_oracles(customers=CUSTOMERS):
+    """
+    oracle_for function backed by the unfiltered lists of the customers, fetched on first use.
+    """
+    oracles = {}
+
+    def oracle_for(customer_id):
+        if customer_id not in customers.values():
+            return None
+        if customer_id not in oracles:
+            response = api.get(api.build_params(customer_id))
+            oracles[customer_id] = FilterOracle(response.json()) if response.status_code == 200 else None
+        return oracles[customer_id]
+
+    return oracle_for
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz the query parameters of the transactions API")
+    parser.add_argument("--budget", type=float, default=5.0, help="Seconds spent sending fuzzed queries")
+    parser.add_argument("--rps", type=float, default=100, help="Maximum requests started per second")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the queries (random when left out)")
+    parser.add_argument("--standin", action="store_true",
+                        help="Fuzz a local stand-in server (no defects) instead of BASE_URL")
+    args = parser.parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+
+    server = None
+    if args.standin:
+        from utils.standin_server import StandInServer, TransactionsStore
+
+        server = StandInServer(TransactionsStore.sample()).start()
+        api.BASE_URL = server.url
+    try:
+        result = fuzz(args.budget, args.rps, args.concurrency, seed, customer_oracles())
+        print(result.summary())
+    finally:
+        http_client.close_client()
+        if server is not None:
+            server.stop()
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Session-level cache of API responses keyed on the normalized query.
+
+    Invalidation policy:
+    - an entry expires `ttl` seconds after it was fetched (ttl=None keeps it for the whole session);
+    - server errors (5xx) are never stored, so a flaky response is always retried;
+    - invalidate(customer_id) drops every entry of a customer and clear() drops everything.
+    """
+
+    def __init__(self, ttl=300.0, enabled=True):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.bypass = False
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, response = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        if not self.enabled or response.status_code >= 500:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+
+    def invalidate(self, customer_id):
+        with self._lock:
+            for key in [key for key in self._entries if ("customerId", customer_id) in key]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
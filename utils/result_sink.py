@@ -0,0 +1,37 @@
+import json
+import os
+import threading
+import time
+
+
+class JsonLinesSink:
+    """
+    Append-only JSON-lines file with one record per line, written as the run goes.
+
+    Every record is a flat JSON object with a "type" ("test" or "exchange") and a "ts" (Unix time), so the
+    file can be grepped, tailed and ingested incrementally while the suite is still running. Each record is
+    written with a single unbuffered write, which keeps the lines of several processes appending to the
+    same file (mode="a") from interleaving.
+    """
+
+    def __init__(self, path, mode="w"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if mode == "w":
+            open(path, "wb").close()
+        # Always append, so writes land at the end of the file whoever else appended in between
+        self._file = open(path, "ab", buffering=0)
+        self._lock = threading.Lock()
+
+    def write(self, record_type, **fields):
+        record = {"type": record_type, "ts": round(time.time(), 6), **fields}
+        line = (json.dumps(record, default=str) + "\n").encode()
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,23 @@
+transaction_schema = {
+    "type": "object",
+    "required": [
+        "transactionId", "amount", "currency", "merchantName", "timestamp",
+        "type", "subType", "status", "categoryId", "description"
+    ],
+    "properties": {
+        "transactionId": {"type": "string"},
+        "amount": {"type": "number"},
+        "currency": {"type": "string"},
+        "merchantName": {"type": ["string", "null"]},
+        "timestamp": {
+            "type": "string",
+            "format": "date-time"
+        },
+        "type": {"type": "string", "enum": ["Debit", "Credit"]},
+        "subType": {"type": "string"},
+        "status": {"type": "string", "enum": ["Pending", "Booked"]},
+        "categoryId": {"type": "integer", "minimum": 1, "maximum": 20},
+        "description": {"type": "string"}
+    },
+    "additionalProperties": False
+}
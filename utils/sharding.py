@@ -0,0 +1,109 @@
+"""
+Runs the tests of a pytest session in worker processes.
+
+The controller splits the collected test IDs into shards balanced by their historical durations and
+starts one `python -m pytest` worker per shard. Each worker appends its serialized test reports to a
+JSON-lines file. The controller replays them through its own hooks, so the terminal output and the HTML
+report cover every test as if they had all run in one process. Responses the controller fetched up front
+are handed to the workers in a shared cache file, so each query is sent once, over the controller's pool,
+however many workers need it.
+"""
+import heapq
+import json
+import os
+import subprocess
+import sys
+
+from utils.cassette import build_response, response_entry
+from utils.durations import fill_unknown, longest_first
+
+
+def partition(nodeids, durations, shards, ordered=False):
+    """
+    Splits nodeids into at most `shards` lists with a similar total duration.
+
+    Longest-processing-time-first: tests are taken slowest first and each goes to the shard with the least
+    work so far (see utils.durations.fill_unknown for tests without history). Each shard keeps its tests
+    in collection order, or slowest first with ordered=True.
+    """
+    estimates = fill_unknown(nodeids, durations)
+    heap = [(0.0, shard) for shard in range(max(min(shards, len(nodeids)), 1))]
+    assigned = [[] for _ in heap]
+    for nodeid in longest_first(nodeids, estimates):
+        load, shard = heapq.heappop(heap)
+        assigned[shard].append(nodeid)
+        heapq.heappush(heap, (load + estimates[nodeid], shard))
+    if not ordered:
+        order = {nodeid: index for index, nodeid in enumerate(nodeids)}
+        assigned = [sorted(shard, key=order.get) for shard in assigned]
+    return [shard for shard in assigned if shard]
+
+
+def write_record(f, kind, data):
+    f.write(json.dumps({"kind": kind, "data": data}) + "\n")
+    f.flush()
+
+
+class RecordReader:
+    """
+    Incrementally reads the complete records a worker has appended to its report file so far.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offset = 0
+        self._pending = ""
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+            self._offset = f.tell()
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        return [json.loads(line) for line in lines if line]
+
+
+def dump_responses(path, responses):
+    """
+    Writes [(params, response)] to a shared cache file read by load_responses.
+    """
+    entries = [{"params": params, "response": response_entry(response)} for params, response in responses]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "entries": entries}, f)
+
+
+def load_responses(path, url=None):
+    """
+    Returns [(params, response)] from a file written by dump_responses.
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["entries"]
+    return [(entry["params"], build_response(entry["response"], url)) for entry in entries]
+
+
+class Worker:
+    """
+    A `python -m pytest` process running one shard; its output goes to log_path.
+    """
+
+    def __init__(self, index, nodeids, report_path, log_path, args, cwd, env):
+        self.index = index
+        self.nodeids = nodeids
+        self.report_path = report_path
+        self.log_path = log_path
+        self.reader = RecordReader(report_path)
+        command = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "-o", "addopts=",
+                   "--shard-report", report_path, *args, *nodeids]
+        with open(log_path, "w", encoding="utf-8") as log:
+            self.process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    @property
+    def running(self):
+        return self.process.poll() is None
+
+    def log_tail(self, lines=20):
+        with open(self.log_path, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
@@ -0,0 +1,279 @@
+"""
+Local stand-in for the transactions API.
+
+Implements the customerId, categoryId, includePending, fromDate and toDate semantics and the 400/404
+error bodies of the real endpoint, serves canned transactions for the customers in utils.customers and
+can inject each of the known API defects listed in the README. Responses are serialized once per
+distinct query and served over keep-alive HTTP/1.1 connections, so it doubles as a load-test target.
+
+Run from the repository root:
+    python -m utils.standin_server --port 8080 --defects all
+"""
+import argparse
+import copy
+import json
+import threading
+import uuid
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.customers import CUSTOMERS
+from utils.datasets import DEFECTS, SyntheticCustomer, parse_defects, parse_rows
+from utils.json_stream import iter_json_array
+from utils.timestamps import parse_timestamp
+
+
+def _transaction(transaction_id, amount, tx_type, status, timestamp, category_id, merchant, description,
+                 sub_type="CardPayment", currency="GBP"):
+    return {
+        "transactionId": transaction_id,
+        "amount": amount,
+        "currency": currency,
+        "merchantName": merchant,
+        "timestamp": timestamp,
+        "type": tx_type,
+        "subType": sub_type,
+        "status": status,
+        "categoryId": category_id,
+        "description": description,
+    }
+
+
+SAMPLE_TRANSACTIONS = {
+    "Customer1": [],
+    "Customer2": [
+        _transaction("c2-0001", -4.5, "Debit", "Pending", "2025-06-06T09:12:00Z", 11, "Coffee Shop", "Flat white"),
+        _transaction("c2-0002", -56.2, "Debit", "Booked", "2025-06-05T18:40:00Z", 4, "Supermarket", "Groceries"),
+        _transaction("c2-0003", 1500.0, "Credit", "Booked", "2025-06-05T08:00:00Z", 1, "Employer Ltd", "Salary",
+                     sub_type="BankTransfer"),
+        _transaction("c2-0004", -12.99, "Debit", "Booked", "2025-06-04T20:15:00Z", 11, "Streaming Co",
+                     "Subscription", sub_type="DirectDebit"),
+        _transaction("c2-0005", -30.0, "Debit", "Booked", "2025-06-02T13:30:00Z", 7, None, "Cash withdrawal",
+                     sub_type="Atm"),
+    ],
+    "Customer3": [
+        _transaction("c3-0001", -22.0, "Debit", "Pending", "2025-06-06T11:00:00Z", 11, "Restaurant", "Lunch"),
+        _transaction("c3-0002", -80.0, "Debit", "Booked", "2025-06-05T16:20:00Z", 3, "Fuel Station", "Fuel"),
+        _transaction("c3-0003", -9.99, "Debit", "Booked", "2025-06-03T07:45:00Z", 12, "Gym", "Membership",
+                     sub_type="DirectDebit"),
+        _transaction("c3-0004", 200.0, "Credit", "Booked", "2025-06-01T10:00:00Z", 2, "J Smith", "Refund",
+                     sub_type="BankTransfer"),
+    ],
+    "Customer4": [
+        _transaction("c4-0001", -15.0, "Debit", "Booked", "2025-06-05T12:00:00Z", 5, "Pharmacy", "Medicine"),
+        _transaction("c4-0002", -64.3, "Debit", "Booked", "2025-06-04T09:30:00Z", 4, "Supermarket", "Groceries"),
+        _transaction("c4-0003", 25.0, "Credit", "Booked", "2025-06-02T17:05:00Z", 2, "A Jones", "Dinner split",
+                     sub_type="BankTransfer"),
+    ],
+    "Customer5": [
+        _transaction("c5-0001", -3.2, "Debit", "Pending", "2025-06-06T08:05:00Z", 11, "Bakery", "Breakfast"),
+        _transaction("c5-0002", -120.0, "Debit", "Booked", "2025-06-05T19:00:00Z", 9, "Electronics", "Headphones"),
+        _transaction("c5-0003", 48.0, "Credit", "Booked", "2025-06-04T14:30:00Z", 2, "Marketplace", "Sale",
+                     sub_type="BankTransfer"),
+        _transaction("c5-0004", -18.75, "Debit", "Booked", "2025-06-03T21:10:00Z", 11, "Cinema", "Tickets"),
+        _transaction("c5-0005", -7.5, "Debit", "Booked", "2025-06-01T12:45:00Z", 6, "Book Store", "Paperback"),
+    ],
+}
+
+
+def inject_defects(transactions_by_customer, defects):
+    """
+    Returns a copy of the canned data with the given defects (keys of DEFECTS) applied.
+    """
+    data = copy.deepcopy(transactions_by_customer)
+    if "unordered_dates" in defects:
+        booked = [i for i, tx in enumerate(data["Customer3"]) if tx["status"] == "Booked"]
+        first, last = booked[0], booked[-1]
+        data["Customer3"][first], data["Customer3"][last] = data["Customer3"][last], data["Customer3"][first]
+    for index, tx in enumerate(data["Customer5"]):
+        if "missing_currency" in defects:
+            tx.pop("currency", None)
+        if "bad_timestamp_format" in defects:
+            tx["timestamp"] = tx["timestamp"].replace("-", "/").replace("T", " ").rstrip("Z")
+        if "positive_debits" in defects and tx["type"] == "Debit" and index % 2:
+            tx["amount"] = abs(tx["amount"])
+    return data
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _parse_bool(name, value):
+    lowered = value.lower()
+    if lowered not in ("true", "false"):
+        raise BadRequest(f"Invalid {name} value")
+    return lowered == "true"
+
+
+def _parse_date(name, value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"Invalid {name} format")
+
+
+class TransactionsStore:
+    """
+    Transactions per customer ID with the endpoint's filtering rules and a cache of serialized responses.
+
+    A customer's transactions are either a list or a utils.datasets.SyntheticCustomer. Responses of
+    synthetic customers are generated and serialized chunk by chunk on every request instead of being
+    cached, so a customer with millions of transactions costs no memory.
+    """
+
+    def __init__(self, transactions_by_id):
+        self.transactions_by_id = transactions_by_id
+        self._cached_respond = lru_cache(maxsize=4096)(self._respond)
+
+    @classmethod
+    def sample(cls, defects=(), synthetic=()):
+        """
+        The canned customers with the given defects, plus the given SyntheticCustomer instances.
+        """
+        data = inject_defects(SAMPLE_TRANSACTIONS, set(defects))
+        transactions_by_id = {CUSTOMERS[key]: transactions for key, transactions in data.items()}
+        transactions_by_id.update((customer.customer_id, customer) for customer in synthetic)
+        return cls(transactions_by_id)
+
+    def respond(self, query):
+        """
+        Returns (status, body) for a normalized query (sorted tuple of first values per parameter); body is
+        bytes, or an iterator of byte chunks for synthetic customers.
+        """
+        if isinstance(self.transactions_by_id.get(dict(query).get("customerId")), SyntheticCustomer):
+            return self._respond(query)
+        return self._cached_respond(query)
+
+    def filter(self, transactions, category_id=None, include_pending=True, from_date=None, to_date=None):
+        for tx in transactions:
+            if category_id is not None and tx.get("categoryId") != category_id:
+                continue
+            if not include_pending and tx.get("status") == "Pending":
+                continue
+            if from_date is not None or to_date is not None:
+                tx_date = parse_timestamp(tx["timestamp"]).date()
+                if (from_date is not None and tx_date < from_date) or (to_date is not None and tx_date > to_date):
+                    continue
+            yield tx
+
+    def _respond(self, query):
+        params = dict(query)
+        try:
+            customer_id = params.get("customerId")
+            if customer_id is None:
+                raise BadRequest("Missing customerId query parameter")
+            try:
+                uuid.UUID(customer_id)
+            except ValueError:
+                raise BadRequest("Invalid customerId guid format")
+            if customer_id not in self.transactions_by_id:
+                return 404, json.dumps("Unknown customerId").encode()
+
+            category_id = None
+            if "categoryId" in params:
+                try:
+                    category_id = int(params["categoryId"])
+                except ValueError:
+                    raise BadRequest("Invalid categoryId")
+            include_pending = _parse_bool("includePending", params["includePending"]) \
+                if "includePending" in params else True
+            from_date = _parse_date("fromDate", params["fromDate"]) if "fromDate" in params else None
+            to_date = _parse_date("toDate", params["toDate"]) if "toDate" in params else None
+        except BadRequest as e:
+            return 400, json.dumps(str(e)).encode()
+
+        transactions = self.transactions_by_id[customer_id]
+        rows = self.filter(transactions, category_id, include_pending, from_date, to_date)
+        if isinstance(transactions, SyntheticCustomer):
+            return 200, iter_json_array(rows)
+        return 200, json.dumps(list(rows)).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "TransactionsStandIn/1.0"
+    # Headers and body are separate writes; without TCP_NODELAY each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+        status, body = self.server.store.respond(tuple(sorted((key, values[0]) for key, values in query.items())))
+        self.send_response_only(status)
+        self.send_header("content-type", "application/json")
+        if isinstance(body, bytes):
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+        for chunk in body:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for a TransactionsStore; start() serves it from a background thread.
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, store, host="127.0.0.1", port=0):
+        super().__init__((host, port), StandInHandler)
+        self.store = store
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/transactions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the transactions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--defects", default="all",
+                        help=f"all, none or a comma-separated list of: {', '.join(DEFECTS)}")
+    parser.add_argument("--synthetic", default="",
+                        help="Also serve synthetic customers of these sizes, e.g. 10k,1M (see utils.datasets); "
+                             "--defects also applies to them")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic customers")
+    args = parser.parse_args(argv)
+
+    defects = parse_defects(args.defects)
+    synthetic = [SyntheticCustomer(rows, seed=args.seed, defects=sorted(defects))
+                 for rows in (parse_rows(args.synthetic) if args.synthetic else [])]
+    server = StandInServer(TransactionsStore.sample(defects, synthetic), args.host, args.port)
+    print(f"Serving the transactions API stand-in on {server.url}")
+    for customer in synthetic:
+        print(f"  synthetic customer {customer.customer_id}: {customer.rows} transactions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import sys
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+# datetime.fromisoformat reads a "Z" offset and any number of fraction digits from Python 3.11
+_FROMISOFORMAT_Z = sys.version_info >= (3, 11)
+_DIGITS = frozenset("0123456789")
+
+# Non RFC 3339 variants seen in API responses (e.g. Customer5), tried in order after datetime.fromisoformat
+LENIENT_FORMATS = (
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%dT%H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+    # An offset without a colon ("+0100"), which fromisoformat only reads from Python 3.11
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%a, %d %b %Y %H:%M:%S %Z",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+)
+
+
+class ParsedTimestamp(NamedTuple):
+    # Timezone-aware; aware datetimes compare by instant whatever their offsets
+    moment: datetime
+    # True when the string is a valid RFC 3339 date-time, False when only a lenient parse succeeded
+    strict: bool
+
+    @property
+    def epoch(self):
+        return self.moment.timestamp()
+
+    @property
+    def offset(self):
+        """
+        Seconds east of UTC the timestamp was written in.
+        """
+        return self.moment.utcoffset().total_seconds()
+
+    def date(self):
+        """
+        Calendar date in the timestamp's own offset, like datetime.fromisoformat(value).date().
+        """
+        return self.moment.date()
+
+
+def _strict(value):
+    """
+    Parses an RFC 3339 date-time (YYYY-MM-DDTHH:MM:SS[.fraction](Z|+HH:MM)) or returns None.
+    Only the separators that tell it apart from the other forms fromisoformat accepts (week dates, a
+    space, basic times, a comma, a missing offset or seconds, "+0100") are checked here; a single
+    fromisoformat call validates the rest.
+    """
+    if len(value) < 20 or value[7] != '-' or value[10] not in 'Tt' or value[16] != ':':
+        return None
+    # What follows the seconds: a fraction, or only the offset
+    after = value[19]
+    if after == '.':
+        if value[20:21] not in _DIGITS:
+            return None
+    elif len(value) != (20 if after in 'Zz' else 25 if after in '+-' else 0):
+        return None
+    last = value[-1]
+    if last == 'Z' and _FROMISOFORMAT_Z:
+        return datetime.fromisoformat(value)
+    if last in 'Zz':
+        value = value[:-1] + '+00:00'
+    elif value[-6] not in '+-' or value[-3] != ':':
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # Before Python 3.11 fromisoformat only takes 3 or 6 fraction digits
+        if value[19] != '.' or _FROMISOFORMAT_Z:
+            raise
+        fraction = value[20:-6]
+        if not fraction.isdigit():
+            raise
+        return datetime.fromisoformat(f"{value[:19]}.{fraction[:6].ljust(6, '0')}{value[-6:]}")
+
+
+def _lenient(value):
+    if not value.isascii():
+        # strptime's %Y, %m, ... match any Unicode digit
+        raise ValueError(f"Unparseable timestamp {value!r}")
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        for fmt in LENIENT_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"Unparseable timestamp {value!r}") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_datetime(value):
+    """
+    Parses a transaction timestamp into a timezone-aware datetime, strictly (RFC 3339) or else leniently
+    (see parse_timestamp). The cheapest entry point, for checks that only compare timestamps.
+    """
+    if type(value) is not str:
+        raise ValueError(f"Timestamp must be a string, got {value!r}")
+    try:
+        parsed = _strict(value)
+    except ValueError:
+        parsed = None
+    return _lenient(value) if parsed is None else parsed
+
+
+def parse_timestamp(value):
+    """
+    Parses a transaction timestamp into a ParsedTimestamp.
+
+    RFC 3339 date-times parse strictly (strict=True); the other formats the API has been seen to return
+    parse leniently (strict=False) and timestamps without an offset are taken as UTC. Raises ValueError
+    when the value is not a timestamp in any known format.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"Timestamp must be a string, got {value!r}")
+    try:
+        parsed = _strict(value)
+    except ValueError:
+        parsed = None
+    if parsed is not None:
+        return ParsedTimestamp(parsed, True)
+    return ParsedTimestamp(_lenient(value), False)
+
+
+def is_strict_timestamp(value):
+    """
+    True when value is a valid RFC 3339 date-time.
+    """
+    try:
+        return parse_timestamp(value).strict
+    except ValueError:
+        return False
+
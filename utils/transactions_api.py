@@ -0,0 +1,151 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+from utils.async_engine import PrefetchStore, run_concurrently
+from utils.cassette import Cassette
+from utils.http_client import get_client
+from utils.json_stream import CHUNK_SIZE, iter_array
+from utils.latency import LatencyRecorder, variant_of
+from utils.response_cache import ResponseCache
+
+# Loads BASE_URL and Headers stored as env variables
+load_dotenv()
+
+BASE_URL = os.getenv("BASE_URL")
+HEADERS = {
+    "host": os.getenv("host")
+}
+
+prefetched = PrefetchStore()
+cache = ResponseCache()
+cassette = Cassette(path=None)
+latencies = LatencyRecorder()
+# Callables observer(params, response, seconds) notified of every request that goes over the wire
+observers = []
+# When set, fetch() leaves response bodies unread and transactions() parses them as they arrive
+stream_responses = False
+
+
+def build_params(customer_id=None, **params):
+    """
+    Builds the query string parameters for a transactions request, lower-casing booleans.
+    """
+    if customer_id is not None:
+        params['customerId'] = customer_id
+    for key, value in params.items():
+        if isinstance(value, bool):
+            params[key] = str(value).lower()
+    return params
+
+
+def query_key(params):
+    """
+    Normalized, hashable form of a query used to match identical requests.
+    """
+    return tuple(sorted((key, str(value)) for key, value in params.items()))
+
+
+def send(params, stream=False):
+    """
+    Sends the request over the wire through the shared pooled client, or serves it from the
+    cassette when one is replaying (see utils.cassette). The latency of every request that goes over
+    the wire is recorded in `latencies` under its query-shape variant and passed to `observers`.
+    With stream=True the body is left unread and the latency recorded is the time to the response headers.
+    """
+    if cassette.plays:
+        response = cassette.play(params, BASE_URL)
+        if response is not None:
+            return response
+    start = time.perf_counter()
+    response = get_client().get(BASE_URL, headers=HEADERS, params=params, stream=stream)
+    elapsed = time.perf_counter() - start
+    latencies.record(variant_of(params), elapsed)
+    for observer in list(observers):
+        observer(params, response, elapsed)
+    if cassette.records:
+        cassette.record(params, response)
+    return response
+
+
+def get(params):
+    """
+    Returns the cached or prefetched response for params if there is one, otherwise sends the request.
+    When the cache is bypassed (see ResponseCache.bypass) the request always goes over the wire.
+    """
+    if cache.bypass:
+        return send(params)
+    key = query_key(params)
+    response = cache.get(key)
+    if response is not None:
+        return response
+    response = prefetched.take(key)
+    if response is None:
+        response = send(params)
+    cache.put(key, response)
+    return response
+
+
+def stream(params):
+    """
+    Like get(), but a response that is not cached or prefetched is returned with its body unread so
+    transactions() can parse it while it downloads. Streamed responses are not cached.
+    """
+    if cache.bypass:
+        return send(params, stream=True)
+    key = query_key(params)
+    response = cache.get(key)
+    if response is not None:
+        return response
+    response = prefetched.take(key)
+    if response is not None:
+        cache.put(key, response)
+        return response
+    return send(params, stream=True)
+
+
+def fetch(params):
+    """
+    get() or, when stream_responses is set, stream().
+    """
+    return stream(params) if stream_responses else get(params)
+
+
+def transactions(response):
+    """
+    The transactions of a response: the parsed list, or when stream_responses is set an iterator that
+    yields each transaction as soon as it has been downloaded, so checks run while the body arrives and
+    memory stays flat whatever the size of the response.
+    """
+    if not stream_responses:
+        return response.json()
+    return _iter_transactions(response)
+
+
+def _iter_transactions(response):
+    try:
+        yield from iter_array(response.iter_content(CHUNK_SIZE))
+    finally:
+        response.close()
+
+
+def prefetch(queries, concurrency=8):
+    """
+    Sends every query concurrently and keeps the responses for the matching get() calls.
+    Failed requests are not stored so the test that needs them sends them again and sees the error.
+    When the cache is enabled identical queries are only sent once.
+    Returns the number of responses stored.
+    """
+    if cache.enabled:
+        queries = list({query_key(params): params for params in queries}.values())
+    else:
+        queries = list(queries)
+    responses = run_concurrently(send, [(params,) for params in queries], concurrency)
+    stored = 0
+    for params, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            continue
+        prefetched.put(query_key(params), response)
+        stored += 1
+    return stored
@@ -0,0 +1,82 @@
+from jsonschema import FormatChecker
+from jsonschema.validators import validator_for
+
+from utils.fast_validator import compile_schema
+from utils.schema import transaction_schema
+from utils.timestamps import is_strict_timestamp
+
+# jsonschema only checks "date-time" when the optional rfc3339-validator package is installed and
+# silently accepts every string otherwise, so the format is checked here instead.
+format_checker = FormatChecker()
+
+
+@format_checker.checks("date-time")
+def is_date_time(value):
+    if not isinstance(value, str):
+        return True
+    return is_strict_timestamp(value)
+
+
+def build_validator(schema):
+    """
+    Checks the schema once and returns a reusable validator with format checking enabled.
+    """
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, format_checker=format_checker)
+
+
+transaction_validator = build_validator(transaction_schema)
+# Code-generated fast path: answers valid/invalid without walking the schema tree.
+is_valid_transaction = compile_schema(transaction_schema, format_checker)
+
+
+def _error_field(error, missing, extra):
+    """
+    Name of the transaction field an error is about.
+    """
+    if error.path:
+        return str(error.path[0])
+    if error.validator == "required" and missing:
+        return missing.pop(0)
+    if error.validator == "additionalProperties" and extra:
+        return ", ".join(extra)
+    return "<transaction>"
+
+
+def validate_transactions(transactions):
+    """
+    Validates a whole response in one pass and returns every violation as {index: {field: [messages]}}.
+
+    Valid transactions cost one compiled fast-path check each; only invalid ones are walked by the
+    generic validator. An empty dict means every transaction is valid. Accepts any iterable.
+    """
+    required = transaction_schema.get("required", [])
+    properties = transaction_schema.get("properties", {})
+    violations = {}
+    for index, transaction in enumerate(transactions):
+        if is_valid_transaction(transaction):
+            continue
+        if isinstance(transaction, dict):
+            missing = [key for key in required if key not in transaction]
+            extra = sorted(key for key in transaction if key not in properties)
+        else:
+            missing, extra = [], []
+        fields = violations.setdefault(index, {})
+        for error in transaction_validator.iter_errors(transaction):
+            fields.setdefault(_error_field(error, missing, extra), []).append(error.message)
+    return violations
+
+
+def format_violations(violations, limit=20):
+    """
+    Compact, one line per transaction and field, summary of validate_transactions() output.
+    """
+    lines = []
+    for index, fields in violations.items():
+        for field, messages in fields.items():
+            lines.append(f"[{index}] {field}: {'; '.join(messages)}")
+    total = len(lines)
+    if total > limit:
+        lines = lines[:limit] + [f"... {total - limit} more"]
+    return "\n".join(lines)
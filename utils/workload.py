@@ -0,0 +1,51 @@
+import random
+
+from utils import transactions_api as api
+from utils.customers import CUSTOMERS
+
+# Query shapes exercised by TestTransactionsAPI, shared with the load generator so both send the same requests
+QUERY_SHAPES = {
+    "plain": {},
+    "category": {"categoryId": 11},
+    "date_range": {"fromDate": "2025-06-04", "toDate": "2025-06-05"},
+    "include_pending": {"includePending": True},
+    "exclude_pending": {"includePending": False},
+}
+
+# Customers that return transactions
+LOAD_CUSTOMERS = ("Customer2", "Customer3", "Customer4", "Customer5")
+
+
+def parse_mix(value):
+    """
+    Parses "plain=4,category=1" into {shape: weight}; shapes left out are not sent.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERY_SHAPES:
+            raise ValueError(f"Unknown query shape {name!r}, expected any of {sorted(QUERY_SHAPES)}")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+class Workload:
+    """
+    Weighted random mix of query shapes over a set of customers, given as keys of `directory`.
+    """
+
+    def __init__(self, mix=None, customers=LOAD_CUSTOMERS, seed=None, directory=CUSTOMERS):
+        self.mix = mix or {name: 1.0 for name in QUERY_SHAPES}
+        self.customers = [directory[key] for key in customers]
+        self._shapes = list(self.mix)
+        self._weights = [self.mix[name] for name in self._shapes]
+        self._random = random.Random(seed)
+
+    def next_query(self):
+        """
+        Returns (shape name, request params) for the next request.
+        """
+        shape = self._random.choices(self._shapes, self._weights)[0]
+        customer_id = self._random.choice(self.customers)
+        return shape, api.build_params(customer_id, **QUERY_SHAPES[shape])